@@ -0,0 +1,18 @@
+# Loaded for every pytest run from the repository root, including the pytest-xdist controller process.
+import pytest
+
+from pythonapiexample.local_quotes_server import LocalQuotesServer
+from pythonapiexample.quotes_client import SendRequest
+
+pytest_plugins = ['pythonapiexample.timing_plugin']
+
+
+@pytest.fixture
+def local_server(monkeypatch, request):
+    """
+    Points SendRequest at a fresh LocalQuotesServer for one test; parametrize it indirectly with True to reproduce
+    the server's bugs
+    """
+    with LocalQuotesServer(reproduce_bugs=getattr(request, 'param', False)) as server:
+        monkeypatch.setattr(SendRequest, 'base_url', server.url)
+        yield server
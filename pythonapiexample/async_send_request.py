@@ -0,0 +1,189 @@
+"""
+An asyncio counterpart of SendRequest built on aiohttp, for running thousands of requests concurrently from one
+process. aiohttp is optional; install it with the 'async' extra (pip3 install -e .[async]).
+
+Example:
+    async with AsyncSendRequest() as client:
+        await client.reset()
+        result = await client.post_many(texts, concurrency=200)
+        response = await client.get()
+"""
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+from pythonapiexample import json_codec
+from pythonapiexample.quote_data import encode_quote_payload
+from pythonapiexample.quotes_client import (BulkPostResult, ResponseError, SendRequest, _Abbreviated,
+                                            _build_post_payload, _check_if_int, _get_key_value_from_response)
+from pythonapiexample.request_timing import RequestTiming
+
+try:
+    import aiohttp
+except ImportError:  # Optional dependency, see the 'async' extra in setup.py.
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncResponse:
+    """
+    A fully read aiohttp response exposing the requests.Response attributes the response helpers rely on
+    (status_code, headers, content, text, json(), elapsed and truthiness), so they work unchanged on it.
+    """
+
+    def __init__(self, status_code, headers, content, elapsed, url):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.elapsed = elapsed
+        self.url = url
+
+    def __bool__(self):
+        return self.ok
+
+    def __repr__(self):
+        return f'<AsyncResponse [{self.status_code}]>'
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json_codec.loads(self.content)
+
+
+class AsyncSendRequest:
+    """Send API requests to 'quotes_server .py' generated url endpoints from asyncio code over a pooled session."""
+
+    pool_size = 100
+
+    def __init__(self, base_url=None, pool_size=None):
+        if aiohttp is None:
+            raise ResponseError('AsyncSendRequest requires aiohttp; install the \'async\' extra.')
+        self.base_url = SendRequest.base_url if base_url is None else base_url
+        self.pool_size = AsyncSendRequest.pool_size if pool_size is None else pool_size
+        self.session = None
+
+    async def open(self):
+        connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30)
+        self.session = aiohttp.ClientSession(connector=connector, headers=SendRequest.headers)
+        return self
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def _send(self, passed_method, passed_endpoint, passed_url, data=None):
+        """Send a request, read its body and report its RequestTiming to the SendRequest hooks"""
+        start = time.perf_counter()
+        try:
+            async with self.session.request(passed_method, passed_url, data=data) as raw_response:
+                time_to_first_byte = time.perf_counter() - start
+                content = await raw_response.read()
+        except aiohttp.ClientError:
+            self._report(RequestTiming(passed_method, passed_endpoint, None, time.perf_counter() - start))
+            raise
+        total = time.perf_counter() - start
+        response = AsyncResponse(raw_response.status, raw_response.headers, content,
+                                 timedelta(seconds=time_to_first_byte), str(raw_response.url))
+        if SendRequest.hooks:
+            self._report(RequestTiming(passed_method, passed_endpoint, response.status_code, total,
+                                       time_to_first_byte=time_to_first_byte, request_bytes=len(data or b''),
+                                       response_bytes=len(content)))
+        return response
+
+    def _report(self, passed_timing):
+        for hook in SendRequest.hooks:
+            hook(passed_timing)
+
+    async def reset(self):
+        # Send POST Request
+        logger.info("POST url: %s/%s", self.base_url, SendRequest.reset_endpoint)
+        return await self._send('POST', SendRequest.reset_endpoint, f'{self.base_url}/{SendRequest.reset_endpoint}',
+                                data=json_codec.dumps(SendRequest.empty_data))
+
+    async def get(self):
+        # Send GET Request
+        logger.info("GET url: %s/%s", self.base_url, SendRequest.quotes_endpoint)
+        return await self._send('GET', SendRequest.quotes_endpoint, f"{self.base_url}/{SendRequest.quotes_endpoint}")
+
+    async def get_id(self, passed_id):
+        # Send GET Request
+        logger.info("GET url: %s/%s/%s", self.base_url, SendRequest.quotes_endpoint, passed_id)
+        _check_if_int(passed_id)
+        return await self._send('GET', f"{SendRequest.quotes_endpoint}/<id>",
+                                f"{self.base_url}/{SendRequest.quotes_endpoint}/{passed_id}")
+
+    async def delete(self, passed_id=''):
+        # Send DELETE Request
+        logger.info("DELETE url: %s/%s/%s", self.base_url, SendRequest.quotes_endpoint, passed_id)
+        return await self._send('DELETE', f"{SendRequest.quotes_endpoint}/<id>",
+                                f"{self.base_url}/{SendRequest.quotes_endpoint}/{passed_id}")
+
+    async def post(self, passed_json_string=''):
+        # Send POST Request
+        logger.info("POST url: %s/%s with data %s", self.base_url, SendRequest.quotes_endpoint,
+                    _Abbreviated(passed_json_string))
+        return await self._send('POST', SendRequest.quotes_endpoint, f"{self.base_url}/{SendRequest.quotes_endpoint}",
+                                data=_build_post_payload(passed_json_string))
+
+    async def post_quote(self, passed_text):
+        # Send POST Request; the payload is serialized straight to bytes
+        logger.info("POST url: %s/%s with a %d character quote", self.base_url, SendRequest.quotes_endpoint,
+                    len(passed_text))
+        return await self._send('POST', SendRequest.quotes_endpoint, f"{self.base_url}/{SendRequest.quotes_endpoint}",
+                                data=encode_quote_payload(passed_text))
+
+    async def post_many(self, passed_texts, concurrency=100):
+        """
+        Send one POST /quotes per text with at most 'concurrency' requests in flight.
+        Failed requests are recorded in the returned BulkPostResult and do not stop the rest of the batch.
+        """
+        texts = list(passed_texts)
+        result = BulkPostResult(len(texts))
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def post_text(passed_position, passed_text):
+            async with semaphore:
+                try:
+                    response = await self.post_quote(passed_text)
+                except aiohttp.ClientError as ex:
+                    logger.error('POST of quote %d failed: %s', passed_position, ex)
+                    result.failures[passed_position] = ex
+                    return
+            new_id = None
+            if response.status_code == 201:
+                response_data = _get_key_value_from_response(response, 'data')
+                new_id = response_data.get('id') if isinstance(response_data, dict) else None
+            if new_id is None:
+                logger.error('POST of quote %d failed with status %s', passed_position, response.status_code)
+                result.failures[passed_position] = response
+            else:
+                result.ids[passed_position] = new_id
+
+        await asyncio.gather(*(post_text(position, text) for position, text in enumerate(texts)))
+        return result
+
+    # The HTTP methods custom_method_endpoint can send.
+    custom_methods = ('GET', 'POST', 'PUT', 'DELETE', 'PATCH', 'HEAD', 'OPTIONS')
+
+    async def custom_method_endpoint(self, passed_endpoint, passed_method):
+        url = self.base_url + '/' + passed_endpoint
+        if passed_method not in AsyncSendRequest.custom_methods:
+            logger.error('Unknown/Unsupported method: \'%s\'.', passed_method)
+            return None
+        logger.info("%s url: %s", passed_method, url)
+        return await self._send(passed_method, passed_endpoint, url)
@@ -0,0 +1,213 @@
+"""
+Finds how many quotes the server can store, without inserting them one request at a time.
+
+The probe grows the store exponentially with concurrent bulk inserts (SendRequest.post_many) until an insert
+fails, then bisects between the last size that worked and the first size that failed. A successful probe keeps
+its quotes, so the next larger probe only inserts the difference; after a failure the store is restored with
+POST /reset and refilled to the last good size. When a failed probe leaves the server listing exactly the quotes
+that were accepted, that count bounds the search directly. Every probed size is reported with its POST and
+GET /quotes latency.
+
+Example:
+    $ python3 -m pythonapiexample.capacity_probe --max-size 500000 --concurrency 32 --output capacity.json
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+
+from pythonapiexample.quotes_client import (ConnectionManager, SendRequest, _get_index_from_server,
+                                            _get_key_value_from_response)
+from pythonapiexample.request_timing import LatencyHistogram, _format_number, _to_ms
+
+logger = logging.getLogger(__name__)
+
+
+class _PostLatency:
+    """A SendRequest hook that records the latency of every POST /quotes"""
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+
+    def __call__(self, passed_timing):
+        if passed_timing.method == 'POST' and passed_timing.endpoint == SendRequest.quotes_endpoint:
+            self.histogram.record(passed_timing.total)
+
+
+class CapacityProbe:
+    """Probes the server at SendRequest.base_url for the largest number of quotes it can store."""
+
+    def __init__(self, concurrency=16, max_size=1000000, payload_size=32, batch_size=1000):
+        self.concurrency = concurrency
+        self.max_size = max_size
+        self.payload_size = payload_size
+        self.batch_size = batch_size
+        self.send_request = SendRequest()
+        self.connection_manager = ConnectionManager(pool_size=concurrency)
+        self.probes = []
+        self._stored = 0
+        self._next_number = 0
+
+    def close(self):
+        self.connection_manager.close()
+
+    def _make_texts(self, passed_count):
+        texts = []
+        for _ in range(passed_count):
+            prefix = f'capacity probe {self._next_number} '
+            texts.append(prefix + 'x' * max(self.payload_size - len(prefix), 0))
+            self._next_number += 1
+        return texts
+
+    def _reset(self):
+        """Resets the server and returns the number of quotes it starts with"""
+        session = self.connection_manager.session
+        response = self.send_request.reset(session)
+        assert response.status_code == 200, f'POST /reset failed with status {response.status_code}'
+        self._stored = len(_get_index_from_server(session, self.send_request))
+        return self._stored
+
+    def _fill(self, passed_target):
+        """Inserts quotes in batches until 'passed_target' are stored; returns False at the first failed batch"""
+        session = self.connection_manager.session
+        while self._stored < passed_target:
+            count = min(passed_target - self._stored, self.batch_size)
+            result = self.send_request.post_many(session, self._make_texts(count), concurrency=self.concurrency)
+            self._stored += len(result.created_ids)
+            if result.failures:
+                return False
+        return True
+
+    def probe(self, passed_size):
+        """Grows the store to 'passed_size' quotes and returns the probe record, with 'ok' False if that failed"""
+        if self._stored > passed_size:
+            self._reset()
+        post_latency = _PostLatency()
+        SendRequest.hooks.append(post_latency)
+        start = time.perf_counter()
+        try:
+            ok = self._fill(passed_size)
+        finally:
+            SendRequest.hooks.remove(post_latency)
+        fill_time = time.perf_counter() - start
+
+        get_start = time.perf_counter()
+        get_response = self.send_request.get(self.connection_manager.session)
+        get_time = time.perf_counter() - get_start
+        listed = None
+        if get_response.status_code == 200:
+            listed = len(_get_key_value_from_response(get_response, 'data') or ())
+        if ok and listed != passed_size:
+            logger.error('GET /quotes returned status %s with %s quotes after storing %d',
+                         get_response.status_code, listed, passed_size)
+            ok = False
+
+        record = {
+            'size': passed_size,
+            'ok': ok,
+            # The server listed exactly the quotes stored before an insert failed, so that size is known to work.
+            'stored': self._stored if listed == self._stored else None,
+            'fill_s': fill_time,
+            'post_p50_ms': _to_ms(post_latency.histogram.percentile(50)),
+            'post_p99_ms': _to_ms(post_latency.histogram.percentile(99)),
+            'get_all_status': get_response.status_code,
+            'get_all_ms': get_time * 1000.0,
+        }
+        logger.info('Probed %d quotes: %s', passed_size, 'ok' if ok else 'failed')
+        self.probes.append(record)
+        return record
+
+    def _restore(self, passed_size):
+        """Resets the server and refills it to a size that is known to work"""
+        self._reset()
+        if not self._fill(passed_size):
+            raise AssertionError(f'Refilling the server to a previously working size of {passed_size} failed')
+
+    def _narrow(self, passed_record, passed_good, passed_bad):
+        """
+        Returns the (good, bad) bounds after a failed probe. When inserts failed with 'stored' quotes listed by the
+        server, that size worked and the next insert did not, which for a plain count limit ends the search at once.
+        """
+        stored = passed_record['stored']
+        if stored is None or not passed_good <= stored < passed_bad:
+            return passed_good, passed_bad
+        return stored, stored + 1
+
+    def run(self):
+        """Returns a JSON serializable report with the largest working store size and every probe record"""
+        self.probes = []
+        good = self._reset()
+        bad = None
+
+        # Exponential growth: double the store until an insert fails or max_size is reached.
+        size = max(good, 1)
+        while bad is None and good < self.max_size:
+            size = min(size * 2, self.max_size)
+            record = self.probe(size)
+            if record['ok']:
+                good = size
+            else:
+                good, bad = self._narrow(record, good, size)
+
+        # Bisection between the largest size that worked and the smallest that failed.
+        while bad is not None and bad - good > 1:
+            if self._stored != good:
+                self._restore(good)
+            size = (good + bad) // 2
+            record = self.probe(size)
+            if record['ok']:
+                good = size
+            else:
+                good, bad = self._narrow(record, good, size)
+
+        return {
+            'base_url': SendRequest.base_url,
+            'max_size': self.max_size,
+            'largest_ok': good,
+            'first_failure': bad,
+            'probes': self.probes,
+        }
+
+
+def _print_report(passed_report):
+    print(f"Capacity probe against {passed_report['base_url']}")
+    print(f"{'size':>10} {'ok':>4} {'fill s':>9} {'post p50':>9} {'post p99':>9} {'get all ms':>11}")
+    for probe in passed_report['probes']:
+        print(f"{probe['size']:>10} {'yes' if probe['ok'] else 'no':>4} {probe['fill_s']:>9.2f} "
+              f"{_format_number(probe['post_p50_ms']):>9} {_format_number(probe['post_p99_ms']):>9} "
+              f"{probe['get_all_ms']:>11.2f}")
+    if passed_report['first_failure'] is None:
+        print(f"No failure up to {passed_report['max_size']} quotes")
+    else:
+        print(f"Largest working store: {passed_report['largest_ok']} quotes "
+              f"(first failure at {passed_report['first_failure']})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Find the largest number of quotes the server can store.')
+    parser.add_argument('--base-url', default=SendRequest.base_url, help='Server to probe')
+    parser.add_argument('--max-size', type=int, default=1000000, help='Stop growing the store at this many quotes')
+    parser.add_argument('--concurrency', type=int, default=16, help='POST requests in flight at once')
+    parser.add_argument('--payload-size', type=int, default=32, help='Characters per quote text')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Quotes inserted per bulk POST batch')
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    args = parser.parse_args(argv)
+
+    SendRequest.base_url = args.base_url
+    probe = CapacityProbe(concurrency=args.concurrency, max_size=args.max_size, payload_size=args.payload_size,
+                          batch_size=args.batch_size)
+    try:
+        report = probe.run()
+    finally:
+        probe.close()
+    _print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4, sort_keys=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+The JSON codec used for every request body the client encodes and every response body it decodes.
+
+The fastest installed backend is picked once at import: orjson, then ujson, then the stdlib json module. Set
+QUOTES_JSON_CODEC=orjson|ujson|json to force one, or call set_codec(). Whatever the backend, dumps() returns UTF-8
+bytes and loads() raises json.JSONDecodeError for invalid input, so callers behave the same with each of them.
+Install orjson with the 'fastjson' extra (pip3 install -e .[fastjson]).
+"""
+import json
+import os
+from json import JSONDecodeError
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, see the 'fastjson' extra in setup.py.
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # Optional dependency.
+    ujson = None
+
+
+def _to_text(passed_data):
+    return passed_data.decode('utf-8', errors='replace') if isinstance(passed_data, (bytes, bytearray)) else passed_data
+
+
+class StdlibJsonCodec:
+    """The stdlib json module; always available."""
+
+    name = 'json'
+
+    def dumps(self, passed_value):
+        return json.dumps(passed_value).encode('utf-8')
+
+    def dumps_pretty(self, passed_value):
+        return json.dumps(passed_value, indent=4, sort_keys=True)
+
+    def loads(self, passed_data):
+        try:
+            return json.loads(passed_data)
+        except UnicodeDecodeError as ex:  # Bytes that are not UTF-8 are invalid JSON like with the other backends.
+            raise JSONDecodeError(str(ex), _to_text(passed_data), ex.start) from ex
+
+
+class OrjsonCodec:
+    """orjson: compact UTF-8 output without ASCII escaping, and the fastest decoder."""
+
+    name = 'orjson'
+
+    def dumps(self, passed_value):
+        return orjson.dumps(passed_value)
+
+    def dumps_pretty(self, passed_value):
+        return orjson.dumps(passed_value, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS).decode('utf-8')
+
+    def loads(self, passed_data):
+        # orjson.JSONDecodeError already subclasses json.JSONDecodeError.
+        return orjson.loads(passed_data)
+
+
+class UjsonCodec:
+    """ujson: faster than the stdlib module, with its own error type that is translated here."""
+
+    name = 'ujson'
+
+    def dumps(self, passed_value):
+        return ujson.dumps(passed_value).encode('utf-8')
+
+    def dumps_pretty(self, passed_value):
+        return ujson.dumps(passed_value, indent=4, sort_keys=True)
+
+    def loads(self, passed_data):
+        try:
+            return ujson.loads(passed_data)
+        except ValueError as ex:
+            raise JSONDecodeError(str(ex), _to_text(passed_data), 0) from ex
+
+
+_CODECS = {
+    'orjson': OrjsonCodec if orjson is not None else None,
+    'ujson': UjsonCodec if ujson is not None else None,
+    'json': StdlibJsonCodec,
+}
+
+
+def available_codecs():
+    """Returns the names of the installed backends, fastest first"""
+    return [name for name, codec_class in _CODECS.items() if codec_class is not None]
+
+
+def _create_codec(passed_name):
+    if passed_name not in _CODECS:
+        raise ValueError(f'Unknown JSON codec: \'{passed_name}\'. Expected one of {tuple(_CODECS)}.')
+    codec_class = _CODECS[passed_name]
+    if codec_class is None:
+        raise ValueError(f'The \'{passed_name}\' JSON codec is not installed.')
+    return codec_class()
+
+
+_codec = _create_codec(os.environ.get('QUOTES_JSON_CODEC') or available_codecs()[0])
+
+
+def get_codec():
+    return _codec
+
+
+def set_codec(passed_codec):
+    """Selects the codec by name ('orjson', 'ujson' or 'json') or as an object; returns the previous one"""
+    global _codec
+    previous = _codec
+    _codec = _create_codec(passed_codec) if isinstance(passed_codec, str) else passed_codec
+    return previous
+
+
+def dumps(passed_value):
+    """Encodes a value to UTF-8 JSON bytes with the current codec"""
+    return _codec.dumps(passed_value)
+
+
+def dumps_pretty(passed_value):
+    """Returns an indented, key-sorted JSON string for display"""
+    return _codec.dumps_pretty(passed_value)
+
+
+def loads(passed_data):
+    """Decodes JSON bytes or text with the current codec; raises json.JSONDecodeError for invalid input"""
+    return _codec.loads(passed_data)
@@ -0,0 +1,416 @@
+"""
+An in-process stand-in for the quotes API server (quotes_server.py).
+
+It serves /quotes, /quotes/<id> and /reset on a background thread, so tests and benchmarks can run without
+starting a separate process. With reproduce_bugs=True it mimics the bugs listed in bugs_found.txt. GET /quotes
+carries an ETag that changes with every change to the store, and a matching If-None-Match is answered with 304.
+GET /quotes?limit=&offset=&min_id=&max_id= returns one page of the id range [min_id, max_id] together with the
+total number of quotes in that range; pages carry the store's ETag too, but are never answered with 304.
+
+For cheap per-test state, POST /snapshots saves the store and returns a snapshot id, POST /snapshots/<id> restores
+it and DELETE /snapshots/<id> drops it. Snapshots are copy-on-write: saving and restoring only share the quote dict,
+which is copied once, on the first change after either.
+
+Example:
+    $ python3 -m pythonapiexample.local_quotes_server --port 6543 --reproduce-bugs
+"""
+import argparse
+import json
+import logging
+import socket
+import threading
+import uuid
+from bisect import bisect_left, bisect_right
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+logger = logging.getLogger(__name__)
+
+INITIAL_QUOTES = (
+    'We have nothing to fear but fear itself!',
+    'Float like a butterfly, sting like a bee.',
+    'The only way to do great work is to love what you do.',
+)
+
+# Bug 3 in bugs_found.txt: the reference server fails once more than this many quotes are stored.
+BUGGY_MAX_QUOTES = 18
+# The query parameters of a paginated GET /quotes.
+PAGE_PARAMETERS = ('limit', 'offset', 'min_id', 'max_id')
+
+
+class QuotesStore:
+    """A thread-safe in-memory quote store."""
+
+    def __init__(self, reproduce_bugs=False):
+        self.reproduce_bugs = reproduce_bugs
+        self._lock = threading.Lock()
+        self._quotes = {}
+        self._next_id = 1
+        # Bumped by every change; with the per-store token it forms the ETag of GET /quotes.
+        self._version = 0
+        self._token = uuid.uuid4().hex[:12]
+        # The ids in list order, kept until the next change so that page reads do not sort the store each time.
+        self._ordered_ids = None
+        self._ordered_version = None
+        # Snapshot id -> (quotes, next id, ordered ids); '_shared' is True while '_quotes' is also held by one.
+        self._snapshots = {}
+        self._next_snapshot_id = 1
+        self._shared = False
+        self.reset()
+
+    @property
+    def etag(self):
+        with self._lock:
+            return f'"{self._token}-{self._version}"'
+
+    def reset(self):
+        with self._lock:
+            self._quotes = {number: text for number, text in enumerate(INITIAL_QUOTES, start=1)}
+            self._next_id = len(INITIAL_QUOTES) + 1
+            self._shared = False
+            self._version += 1
+
+    def _before_change(self):
+        """Copies the quote dict if a snapshot shares it; called with the lock held before every change"""
+        if self._shared:
+            self._quotes = dict(self._quotes)
+            self._shared = False
+
+    def snapshot(self):
+        """Saves the current quotes and returns (snapshot id, number of quotes) without copying them"""
+        with self._lock:
+            snapshot_id = self._next_snapshot_id
+            self._next_snapshot_id += 1
+            self._snapshots[snapshot_id] = (self._quotes, self._next_id, self._get_ordered_ids())
+            self._shared = True
+            return snapshot_id, len(self._quotes)
+
+    def restore(self, snapshot_id):
+        """Restores a snapshot in constant time and returns the number of quotes, or None if it does not exist"""
+        with self._lock:
+            saved = self._snapshots.get(snapshot_id)
+            if saved is None:
+                return None
+            self._quotes, self._next_id, ordered_ids = saved
+            self._shared = True
+            self._version += 1
+            self._ordered_ids, self._ordered_version = ordered_ids, self._version
+            return len(self._quotes)
+
+    def delete_snapshot(self, snapshot_id):
+        """Drops a snapshot and returns True, or returns False if it does not exist"""
+        with self._lock:
+            return self._snapshots.pop(snapshot_id, None) is not None
+
+    def list(self):
+        """Returns all quotes sorted by id (alphabetically by id when reproducing bugs)"""
+        return self.list_with_etag()[0]
+
+    def list_with_etag(self):
+        """Returns all quotes and the ETag of that exact state, read under one lock"""
+        quotes, _, etag = self.list_page()
+        return quotes, etag
+
+    def _get_ordered_ids(self):
+        if self._ordered_version != self._version:
+            self._ordered_ids = sorted(self._quotes, key=str if self.reproduce_bugs else None)
+            self._ordered_version = self._version
+        return self._ordered_ids
+
+    def list_page(self, limit=None, offset=0, min_id=None, max_id=None):
+        """
+        Returns the quotes with ids in [min_id, max_id] in list order, skipping 'offset' and returning at most
+        'limit' of them, with the number of quotes in the whole range and the ETag of the store, under one lock
+        """
+        with self._lock:
+            ids = self._get_ordered_ids()
+            if min_id is not None or max_id is not None:
+                if self.reproduce_bugs:
+                    # Ids are in string order here, so the range is not contiguous.
+                    ids = [quote_id for quote_id in ids
+                           if (min_id is None or quote_id >= min_id) and (max_id is None or quote_id <= max_id)]
+                else:
+                    start = 0 if min_id is None else bisect_left(ids, min_id)
+                    end = len(ids) if max_id is None else bisect_right(ids, max_id)
+                    ids = ids[start:end] if start < end else []
+            total = len(ids)
+            page_ids = ids[offset:] if limit is None else ids[offset:offset + limit]
+            quotes = [{'id': quote_id, 'text': self._quotes[quote_id]} for quote_id in page_ids]
+            return quotes, total, f'"{self._token}-{self._version}"'
+
+    def get(self, quote_id):
+        with self._lock:
+            text = self._quotes.get(quote_id)
+        return None if text is None else {'id': quote_id, 'text': text}
+
+    def add(self, text):
+        with self._lock:
+            if self.reproduce_bugs and len(self._quotes) >= BUGGY_MAX_QUOTES:
+                raise OverflowError(f'Storage is limited to {BUGGY_MAX_QUOTES} quotes')
+            self._before_change()
+            quote_id = self._next_id
+            self._next_id += 1
+            self._quotes[quote_id] = text
+            self._version += 1
+        return {'id': quote_id, 'text': text}
+
+    def delete(self, quote_id):
+        """Deletes a quote and returns True, or returns False if it does not exist"""
+        with self._lock:
+            if quote_id not in self._quotes:
+                return False
+            self._before_change()
+            del self._quotes[quote_id]
+            self._version += 1
+            return True
+
+
+class QuotesRequestHandler(BaseHTTPRequestHandler):
+    """Routes quotes API requests to the QuotesStore of the owning server."""
+
+    protocol_version = 'HTTP/1.1'  # Keep connections alive between requests.
+    disable_nagle_algorithm = True  # Headers and body are written separately; avoid delayed-ACK stalls.
+
+    @property
+    def store(self):
+        return self.server.store
+
+    def log_message(self, format, *args):
+        logger.debug('%s - %s', self.address_string(), format % args)
+
+    def _send_json(self, status, payload, etag=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if etag is not None:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_not_modified(self, etag):
+        self.send_response(304)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def _send_error_json(self, status, message):
+        self._send_json(status, {'ok': False, 'error': message})
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _get_page_parameters(self):
+        """Returns the page query parameters as a dict of ints, or None if one is not a valid number"""
+        query = parse_qs(self.path.split('?', 1)[1]) if '?' in self.path else {}
+        parameters = {}
+        for name in PAGE_PARAMETERS:
+            if name in query:
+                try:
+                    parameters[name] = int(query[name][-1])
+                except ValueError:
+                    return None
+                if name in ('limit', 'offset') and parameters[name] < 0:
+                    return None
+        return parameters
+
+    def _route(self):
+        """
+        Returns ('quotes' | 'quote' | 'reset' | 'snapshots' | 'snapshot' | None, quote or snapshot id or None)
+        for the request path
+        """
+        path = self.path.split('?', 1)[0].rstrip('/')
+        if path == '/quotes':
+            return 'quotes', None
+        if path == '/reset':
+            return 'reset', None
+        if path == '/snapshots':
+            return 'snapshots', None
+        for prefix, route in (('/quotes/', 'quote'), ('/snapshots/', 'snapshot')):
+            if path.startswith(prefix):
+                try:
+                    return route, int(path[len(prefix):])
+                except ValueError:
+                    return None, None
+        return None, None
+
+    def _method_not_allowed(self):
+        if self.store.reproduce_bugs:
+            # Bugs 4 and 5 in bugs_found.txt: the reference server answers with the default HTML 501 page.
+            self.send_error(501, f'Unsupported method ({self.command!r})')
+        else:
+            self._send_error_json(405, 'Method not allowed')
+
+    def do_GET(self):
+        route, quote_id = self._route()
+        if route == 'quotes':
+            parameters = self._get_page_parameters()
+            if parameters is None:
+                self._send_error_json(400, 'limit, offset, min_id and max_id must be integers, limit and offset >= 0')
+            elif parameters:
+                # Pages carry the store's ETag so readers can tell the store changed between pages, but each page is
+                # a different representation, so If-None-Match is not honored for them.
+                quotes, total, etag = self.store.list_page(**parameters)
+                self._send_json(200, {'ok': True, 'data': quotes, 'total': total,
+                                      'offset': parameters.get('offset', 0)}, etag=etag)
+            else:
+                # Conditional GET: an If-None-Match with the current ETag is answered without a body.
+                if_none_match = self.headers.get('If-None-Match')
+                if if_none_match is not None and if_none_match == self.store.etag:
+                    self._send_not_modified(if_none_match)
+                    return
+                quotes, etag = self.store.list_with_etag()
+                self._send_json(200, {'ok': True, 'data': quotes}, etag=etag)
+        elif route == 'quote':
+            quote = self.store.get(quote_id)
+            if quote is None:
+                self._send_error_json(404, 'Quote not found')
+            else:
+                self._send_json(200, {'ok': True, 'data': quote})
+        elif route in ('reset', 'snapshots', 'snapshot'):
+            self._method_not_allowed()
+        else:
+            self._send_error_json(404, 'Not found')
+
+    def do_POST(self):
+        route, snapshot_id = self._route()
+        body = self._read_body()
+        if route == 'reset':
+            self.store.reset()
+            self._send_json(200, {'ok': True})
+        elif route == 'quotes':
+            self._post_quote(body)
+        elif route == 'snapshots':
+            snapshot_id, count = self.store.snapshot()
+            self._send_json(201, {'ok': True, 'data': {'id': snapshot_id, 'count': count}})
+        elif route == 'snapshot':
+            count = self.store.restore(snapshot_id)
+            if count is None:
+                self._send_error_json(404, 'Snapshot not found')
+            else:
+                self._send_json(200, {'ok': True, 'data': {'id': snapshot_id, 'count': count}})
+        elif route == 'quote':
+            self._method_not_allowed()
+        else:
+            self._send_error_json(404, 'Not found')
+
+    def _post_quote(self, body):
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            self._send_error_json(400, 'Request body is not valid JSON')
+            return
+        if not isinstance(payload, dict):
+            # Bug 2 in bugs_found.txt: a payload that is not a JSON object crashes the reference server.
+            if self.store.reproduce_bugs:
+                self._send_error_json(500, 'Unhandled error')
+            else:
+                self._send_error_json(400, 'Request body must be a JSON object')
+            return
+        text = payload.get('text')
+        if not isinstance(text, str):
+            self._send_error_json(400, 'The "text" field must be a string')
+            return
+        try:
+            quote = self.store.add(text)
+        except OverflowError:
+            self._send_error_json(500, 'Unhandled error')
+            return
+        self._send_json(201, {'ok': True, 'data': quote})
+
+    def do_DELETE(self):
+        route, quote_id = self._route()
+        if route == 'quote':
+            if self.store.delete(quote_id):
+                self._send_json(200, {'ok': True, 'data': None})
+            else:
+                self._send_error_json(404, 'Quote not found')
+        elif route == 'snapshot':
+            if self.store.delete_snapshot(quote_id):
+                self._send_json(200, {'ok': True, 'data': None})
+            else:
+                self._send_error_json(404, 'Snapshot not found')
+        elif route == 'quotes' and not self.path.split('?', 1)[0].endswith('/'):
+            self._method_not_allowed()
+        else:
+            self._send_error_json(404, 'Not found')
+
+    def do_PUT(self):
+        self._read_body()
+        route, _ = self._route()
+        if route is None:
+            self._send_error_json(404, 'Not found')
+        else:
+            self._method_not_allowed()
+
+    do_PATCH = do_PUT
+
+
+class _QuotesHTTPServer(ThreadingHTTPServer):
+    """A ThreadingHTTPServer with a listen backlog large enough for highly concurrent clients."""
+
+    # The default backlog of 5 drops connection attempts under load, and each dropped SYN stalls a client ~1 s.
+    request_queue_size = max(socket.SOMAXCONN, 128)
+    daemon_threads = True
+
+
+class LocalQuotesServer:
+    """Runs a quotes API server on a background thread; port 0 picks a free ephemeral port."""
+
+    def __init__(self, host='127.0.0.1', port=0, reproduce_bugs=False):
+        self.store = QuotesStore(reproduce_bugs=reproduce_bugs)
+        self._httpd = _QuotesHTTPServer((host, port), QuotesRequestHandler)
+        self._httpd.store = self.store
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='local-quotes-server', daemon=True)
+        self._thread.start()
+        logger.info('Started local quotes server on %s', self.url)
+        return self
+
+    def serve_forever(self):
+        """Serves requests on the calling thread until interrupted"""
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the quotes API from this process.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6543)
+    parser.add_argument('--reproduce-bugs', action='store_true', help='Mimic the bugs listed in bugs_found.txt')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    server = LocalQuotesServer(args.host, args.port, reproduce_bugs=args.reproduce_bugs)
+    logger.info('Starting server on %s:%d', args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
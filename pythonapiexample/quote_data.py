@@ -0,0 +1,169 @@
+"""
+Seeded, reproducible quote data for the tests, benchmarks and load tools.
+
+QuoteGenerator turns a seed into the same sequence of lorem-ipsum style quotes on every run, in batches fast enough
+for stores with millions of entries; every quote from one generator is unique. sized_text builds texts whose
+POST /quotes body is an exact number of bytes, including escaping-heavy and non-ASCII variants, measured with the
+same JSON codec SendRequest.post_quote uses. Large fixtures can be cached on disk with QuoteDataCache.
+
+Example:
+    generator = QuoteGenerator(seed=42)
+    texts = generator.sentences(1000000)
+    body_of_4_kib = generator.sized_text(4096, style='unicode')
+"""
+import json
+import os
+import random
+import tempfile
+
+from pythonapiexample import json_codec
+
+# Bump when the generated data changes, so that stale disk caches are not reused.
+DATA_VERSION = 1
+
+WORDS = (
+    'lorem', 'ipsum', 'dolor', 'sit', 'amet', 'consectetur', 'adipiscing', 'elit', 'sed', 'do', 'eiusmod', 'tempor',
+    'incididunt', 'ut', 'labore', 'et', 'dolore', 'magna', 'aliqua', 'enim', 'ad', 'minim', 'veniam', 'quis',
+    'nostrud', 'exercitation', 'ullamco', 'laboris', 'nisi', 'aliquip', 'ex', 'ea', 'commodo', 'consequat', 'duis',
+    'aute', 'irure', 'in', 'reprehenderit', 'voluptate', 'velit', 'esse', 'cillum', 'eu', 'fugiat', 'nulla',
+    'pariatur', 'excepteur', 'sint', 'occaecat', 'cupidatat', 'non', 'proident', 'sunt', 'culpa', 'qui', 'officia',
+    'deserunt', 'mollit', 'anim', 'id', 'est', 'laborum', 'curabitur', 'pretium', 'tincidunt', 'lacus', 'nunc',
+    'pulvinar', 'ante', 'viverra', 'mauris', 'cursus', 'mattis', 'molestie', 'iaculis', 'fringilla', 'phasellus',
+    'faucibus', 'scelerisque', 'eleifend', 'donec', 'vitae', 'semper', 'quam', 'pellentesque', 'habitant', 'morbi',
+    'tristique', 'senectus', 'netus', 'malesuada', 'fames', 'turpis', 'egestas', 'integer', 'feugiat', 'purus',
+)
+
+# Characters mixed into the 'escape' and 'unicode' payload styles.
+ESCAPE_CHARACTERS = ('"', '\\', '/', '\n', '\r', '\t', '\b', '\f', '\x00', '\x1f', "'", '<', '>', '&')
+UNICODE_CHARACTERS = ('é', 'ß', 'Ω', 'ж', 'ش', 'א', '中', '文', 'ひ', '한', '€', '✓', '\u200b', '😀', '🚀', '𝄞')
+PAYLOAD_STYLES = ('ascii', 'escape', 'unicode')
+_SENTENCE_LENGTHS = tuple(range(4, 13))
+
+
+def encode_quote_payload(passed_text):
+    """Returns the POST /quotes body for a quote text, exactly as SendRequest.post_quote sends it"""
+    return json_codec.dumps({'text': passed_text})
+
+
+class QuoteGenerator:
+    """Generates reproducible quote texts from a seed."""
+
+    def __init__(self, seed=0):
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._next_number = 0
+
+    def _number_words(self, passed_number):
+        """Spells a number with WORDS as digits, which makes every quote of this generator unique"""
+        words = WORDS[passed_number % len(WORDS)]
+        passed_number //= len(WORDS)
+        while passed_number:
+            words += ' ' + WORDS[passed_number % len(WORDS)]
+            passed_number //= len(WORDS)
+        return words
+
+    def sentence(self):
+        """Returns one unique quote, a sentence of about 5 to 15 words"""
+        return self.sentences(1)[0]
+
+    def sentences(self, passed_count):
+        """Returns a batch of 'passed_count' unique quotes"""
+        # Draw every random choice of the batch in two calls; per-quote random calls dominate the run time otherwise.
+        lengths = self._random.choices(_SENTENCE_LENGTHS, k=passed_count)
+        words = self._random.choices(WORDS, k=sum(lengths))
+        sentences = []
+        position = 0
+        number_words = self._number_words
+        for number, length in enumerate(lengths, start=self._next_number):
+            sentences.append(' '.join(words[position:position + length]).capitalize() + ' '
+                             + number_words(number) + '.')
+            position += length
+        self._next_number += passed_count
+        return sentences
+
+    def paragraphs(self, passed_count):
+        """Returns 'passed_count' paragraphs of 4 to 8 sentences each"""
+        return [' '.join(self.sentences(self._random.randint(4, 8))) for _ in range(passed_count)]
+
+    def sized_text(self, passed_size, style='ascii'):
+        """
+        Returns a unique text whose encoded POST /quotes body is exactly 'passed_size' bytes.
+        'ascii' fills it with words, 'escape' mixes in characters that JSON must escape, and 'unicode' mixes in
+        characters outside ASCII, including ones outside the Basic Multilingual Plane.
+        """
+        return self.sized_texts(1, passed_size, style=style)[0]
+
+    def sized_texts(self, passed_count, passed_size, style='ascii'):
+        """Returns a batch of 'passed_count' unique texts with POST /quotes bodies of exactly 'passed_size' bytes"""
+        if style not in PAYLOAD_STYLES:
+            raise ValueError(f'Unknown payload style: \'{style}\'. Expected one of {PAYLOAD_STYLES}.')
+        extra_characters = {'ascii': (), 'escape': ESCAPE_CHARACTERS, 'unicode': UNICODE_CHARACTERS}[style]
+        # Measured with the current JSON codec, since backends escape differently.
+        overhead = len(encode_quote_payload(''))
+        costs = {character: len(encode_quote_payload(character)) - overhead for character in extra_characters}
+        texts = []
+        for _ in range(passed_count):
+            prefix = f'{self._next_number} '
+            self._next_number += 1
+            budget = passed_size - overhead - len(prefix)
+            if budget < 0:
+                raise ValueError(f'A unique POST /quotes body needs at least {passed_size - budget} bytes.')
+            parts = [prefix]
+            while budget > 0:
+                if costs and self._random.random() < 0.5:
+                    character = self._random.choice(extra_characters)
+                    if costs[character] <= budget:
+                        parts.append(character)
+                        budget -= costs[character]
+                        continue
+                word = self._random.choice(WORDS)[:budget - 1] + ' ' if budget > 1 else 'x'
+                parts.append(word)
+                budget -= len(word)
+            texts.append(''.join(parts))
+        return texts
+
+
+class QuoteDataCache:
+    """
+    Caches generated quote lists on disk as JSON lines, keyed by generator settings and DATA_VERSION.
+    The directory defaults to $QUOTES_DATA_CACHE, or a folder in the system temp directory.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or os.environ.get('QUOTES_DATA_CACHE') or os.path.join(
+            tempfile.gettempdir(), 'pythonapiexample-quote-data')
+
+    def _path(self, passed_key):
+        return os.path.join(self.directory, f'{passed_key}-v{DATA_VERSION}.jsonl')
+
+    def get(self, passed_key, passed_builder):
+        """Returns the cached list for 'passed_key', building and storing it with 'passed_builder' on a miss"""
+        path = self._path(passed_key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                return [json.loads(line) for line in f]
+        except (OSError, ValueError):
+            pass
+        texts = passed_builder()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write to a private file first so that concurrent test workers never read a partial cache file.
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.writelines(json.dumps(text) + '\n' for text in texts)
+            os.replace(temp_path, path)
+        except OSError:
+            pass  # A read-only or full disk only costs the cache, not the data.
+        return texts
+
+
+def cached_sentences(passed_count, seed=0, cache=None):
+    """Returns QuoteGenerator(seed).sentences(passed_count), from the disk cache when available"""
+    cache = QuoteDataCache() if cache is None else cache
+    return cache.get(f'sentences-{seed}-{passed_count}', lambda: QuoteGenerator(seed).sentences(passed_count))
+
+
+def cached_paragraphs(passed_count, seed=0, cache=None):
+    """Returns QuoteGenerator(seed).paragraphs(passed_count), from the disk cache when available"""
+    cache = QuoteDataCache() if cache is None else cache
+    return cache.get(f'paragraphs-{seed}-{passed_count}', lambda: QuoteGenerator(seed).paragraphs(passed_count))
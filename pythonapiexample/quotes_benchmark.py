@@ -0,0 +1,247 @@
+"""
+Throughput and latency benchmarks for the quotes API endpoints.
+
+Each scenario resets the server, seeds the store, then drives one endpoint through SendRequest at a fixed
+concurrency and reports requests per second and p50/p95/p99 latency. Results are written as JSON so that a
+later run can be compared against them with --baseline. With --local the benchmark starts the bundled
+LocalQuotesServer in this process and needs no network or separate server.
+
+Example:
+    $ python3 -m pythonapiexample.quotes_benchmark --local --concurrency 32
+    $ python3 -m pythonapiexample.quotes_benchmark --store-size 100 --output baseline.json
+    $ python3 -m pythonapiexample.quotes_benchmark --store-size 100 --output current.json --baseline baseline.json
+"""
+import argparse
+import json
+import logging
+import math
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pythonapiexample.local_quotes_server import LocalQuotesServer
+from pythonapiexample.quote_data import PAYLOAD_STYLES, QuoteGenerator
+from pythonapiexample.quotes_client import ConnectionManager, SendRequest, _get_key_value_from_response
+from pythonapiexample.request_timing import _format_number
+
+logger = logging.getLogger(__name__)
+
+SCENARIOS = ('get_all', 'get_id', 'post', 'delete')
+
+
+def _percentile(sorted_values, percent):
+    """Returns the nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    # The smallest value with at least 'percent' percent of the values at or below it; percent * n is computed
+    # first so that e.g. 7 * 100 / 100 stays exactly 7.
+    rank = max(math.ceil(percent * len(sorted_values) / 100.0) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class BenchmarkConfig:
+    """Settings shared by every scenario in a benchmark run."""
+
+    def __init__(self, concurrency=8, store_size=100, payload_size=100, requests_per_scenario=500,
+                 scenarios=SCENARIOS, payload_style='ascii', seed=0):
+        self.concurrency = concurrency
+        self.store_size = store_size
+        self.payload_size = payload_size
+        self.requests_per_scenario = requests_per_scenario
+        self.scenarios = tuple(scenarios)
+        self.payload_style = payload_style
+        self.seed = seed
+
+    def as_dict(self):
+        return {
+            'concurrency': self.concurrency,
+            'store_size': self.store_size,
+            'payload_size': self.payload_size,
+            'requests_per_scenario': self.requests_per_scenario,
+            'scenarios': list(self.scenarios),
+            'payload_style': self.payload_style,
+            'seed': self.seed,
+        }
+
+
+class QuotesBenchmark:
+    """Runs the benchmark scenarios against the server at SendRequest.base_url."""
+
+    def __init__(self, config):
+        self.config = config
+        self.send_request = SendRequest()
+        self.connection_manager = ConnectionManager(pool_size=config.concurrency)
+
+    def close(self):
+        self.connection_manager.close()
+
+    def _make_texts(self, passed_generator, passed_count):
+        return passed_generator.sized_texts(passed_count, self.config.payload_size, style=self.config.payload_style)
+
+    def _seed(self, passed_generator, passed_count):
+        """Resets the server and stores 'passed_count' quotes in total; returns all stored ids"""
+        session = self.connection_manager.session
+        response = self.send_request.reset(session)
+        assert response.status_code == 200, f'POST /reset failed with status {response.status_code}'
+        initial_ids = [elem['id'] for elem in _get_key_value_from_response(self.send_request.get(session), 'data')]
+        texts = self._make_texts(passed_generator, passed_count - len(initial_ids))
+        result = self.send_request.post_many(session, texts, concurrency=self.config.concurrency)
+        if result.failures:
+            logger.error('%d of %d seed quotes could not be stored', len(result.failures), len(texts))
+        return initial_ids + result.created_ids
+
+    def _prepare(self, passed_scenario):
+        """Seeds the store and returns a (send function, expected status) pair for one request number"""
+        session = self.connection_manager.session
+        num_requests = self.config.requests_per_scenario
+        # A fresh generator per scenario keeps each scenario's data identical whichever scenarios run.
+        generator = QuoteGenerator(self.config.seed)
+        if passed_scenario == 'get_all':
+            self._seed(generator, self.config.store_size)
+            return (lambda x: self.send_request.get(session)), 200
+        if passed_scenario == 'get_id':
+            ids = self._seed(generator, self.config.store_size)
+            return (lambda x: self.send_request.get_id(session, ids[x % len(ids)])), 200
+        if passed_scenario == 'post':
+            self._seed(generator, self.config.store_size)
+            texts = self._make_texts(generator, num_requests)
+            return (lambda x: self.send_request.post_quote(session, texts[x])), 201
+        if passed_scenario == 'delete':
+            # Seed one extra quote per request so that every DELETE targets an id that still exists.
+            ids = self._seed(generator, self.config.store_size + num_requests)
+            return (lambda x: self.send_request.delete(session, ids[-x - 1])), 200
+        raise ValueError(f'Unknown scenario: \'{passed_scenario}\'. Expected one of {SCENARIOS}.')
+
+    def run_scenario(self, passed_scenario):
+        """Runs one scenario and returns its throughput and latency summary"""
+        send, expected_status = self._prepare(passed_scenario)
+
+        def timed_send(passed_number):
+            start = time.perf_counter()
+            try:
+                status = send(passed_number).status_code
+            except Exception as ex:  # Count transport errors as failed requests instead of aborting the run.
+                logger.error('%s request %d failed: %s', passed_scenario, passed_number, ex)
+                status = None
+            return time.perf_counter() - start, status
+
+        logger.info('Running %s with %d requests', passed_scenario, self.config.requests_per_scenario)
+        run_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.config.concurrency) as executor:
+            samples = list(executor.map(timed_send, range(self.config.requests_per_scenario)))
+        duration = time.perf_counter() - run_start
+
+        latencies_ms = sorted(latency * 1000.0 for latency, _ in samples)
+        errors = sum(1 for _, status in samples if status != expected_status)
+        return {
+            'requests': len(samples),
+            'errors': errors,
+            'duration_s': duration,
+            'requests_per_second': len(samples) / duration if duration else None,
+            'latency_ms': {
+                'mean': sum(latencies_ms) / len(latencies_ms) if latencies_ms else None,
+                'p50': _percentile(latencies_ms, 50),
+                'p95': _percentile(latencies_ms, 95),
+                'p99': _percentile(latencies_ms, 99),
+                'max': latencies_ms[-1] if latencies_ms else None,
+            },
+        }
+
+    def run(self):
+        """Runs every configured scenario and returns the full, JSON serializable report"""
+        return {
+            'base_url': SendRequest.base_url,
+            'timestamp': time.time(),
+            'config': self.config.as_dict(),
+            'results': {scenario: self.run_scenario(scenario) for scenario in self.config.scenarios},
+        }
+
+
+def compare_results(baseline, current, threshold=0.1):
+    """
+    Returns a list of regression descriptions between two reports.
+    A regression is a throughput drop or a p95/p99 latency increase of more than 'threshold' (a fraction).
+    """
+    regressions = []
+    for scenario, current_result in current['results'].items():
+        baseline_result = baseline.get('results', {}).get(scenario)
+        if baseline_result is None:
+            continue
+        old_rps = baseline_result['requests_per_second']
+        new_rps = current_result['requests_per_second']
+        if old_rps and new_rps is not None and new_rps < old_rps * (1 - threshold):
+            regressions.append(f'{scenario}: throughput dropped from {old_rps:.1f} to {new_rps:.1f} req/s')
+        for percentile in ('p95', 'p99'):
+            old_latency = baseline_result['latency_ms'][percentile]
+            new_latency = current_result['latency_ms'][percentile]
+            if old_latency and new_latency is not None and new_latency > old_latency * (1 + threshold):
+                regressions.append(
+                    f'{scenario}: {percentile} latency rose from {old_latency:.2f} to {new_latency:.2f} ms')
+    return regressions
+
+
+def _print_report(passed_report):
+    print(f"Benchmark against {passed_report['base_url']}")
+    print(f"{'scenario':<10} {'req/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'errors':>8}")
+    for scenario, result in passed_report['results'].items():
+        latency = result['latency_ms']
+        print(f"{scenario:<10} {_format_number(result['requests_per_second'], '.1f'):>10} "
+              f"{_format_number(latency['p50']):>10} {_format_number(latency['p95']):>10} "
+              f"{_format_number(latency['p99']):>10} {result['errors']:>8}")
+
+
+def _run_benchmark(passed_config):
+    benchmark = QuotesBenchmark(passed_config)
+    try:
+        return benchmark.run()
+    finally:
+        benchmark.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the quotes API endpoints.')
+    parser.add_argument('--base-url', default=SendRequest.base_url, help='Server to benchmark')
+    parser.add_argument('--local', action='store_true',
+                        help='Benchmark a LocalQuotesServer started in this process instead of --base-url')
+    parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight at once')
+    parser.add_argument('--store-size', type=int, default=100, help='Quotes stored before each scenario')
+    parser.add_argument('--payload-size', type=int, default=100, help='Bytes per encoded POST /quotes body')
+    parser.add_argument('--payload-style', choices=PAYLOAD_STYLES, default='ascii',
+                        help='Plain words, JSON escaping-heavy or non-ASCII quote texts')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the generated quote texts')
+    parser.add_argument('--requests', type=int, default=500, help='Requests sent per scenario')
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS, help='Scenario to run (repeatable)')
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    parser.add_argument('--baseline', help='JSON report of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Allowed relative regression, e.g. 0.1')
+    args = parser.parse_args(argv)
+
+    config = BenchmarkConfig(concurrency=args.concurrency, store_size=args.store_size,
+                             payload_size=args.payload_size, requests_per_scenario=args.requests,
+                             scenarios=args.scenario or SCENARIOS, payload_style=args.payload_style, seed=args.seed)
+    if args.local:
+        with LocalQuotesServer() as server:
+            SendRequest.base_url = server.url
+            report = _run_benchmark(config)
+    else:
+        SendRequest.base_url = args.base_url
+        report = _run_benchmark(config)
+    _print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, report, args.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
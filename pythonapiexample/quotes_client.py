@@ -0,0 +1,804 @@
+"""
+The quotes API client: SendRequest and the helpers the tests and tools use to send requests and read responses.
+
+SendRequest sends every request through a requests.Session, optionally timing it for the SendRequest.hooks,
+recording it (traffic_replay) and caching GET /quotes (ResponseCache). ConnectionManager owns a pooled session,
+QuotePages reads the store in parallel pages, SeededStates restores seeded stores from server snapshots, and the
+_get_* helpers decode responses and read the store.
+
+Example:
+    $ python3 -m pythonapiexample.quotes_client
+"""
+import codecs
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from json import JSONDecodeError
+
+import jsonpath
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from pythonapiexample import json_codec
+from pythonapiexample.quote_data import QuoteGenerator, encode_quote_payload
+from pythonapiexample.request_timing import RequestTiming, TimingHTTPAdapter, get_connect_time, reset_connect_time
+from pythonapiexample.store_snapshot import StoreSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Matches expressions such as 'ok', 'data' or '$.data.id' that only name dict keys.
+_PLAIN_KEY_PATH_PATTERN = re.compile(r'^(?:\$\.)?[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*$')
+
+
+class JsonQuery:
+    """A jsonpath expression prepared once and reusable against any decoded JSON payload.
+
+    Expressions made only of plain dict keys are answered with direct dict lookups. Anything else
+    (wildcards, recursive descent, filters, indexes) is passed on to jsonpath.
+    """
+
+    def __init__(self, expression):
+        self.expression = expression
+        if _PLAIN_KEY_PATH_PATTERN.match(expression):
+            self.keys = tuple(expression[2:].split('.') if expression.startswith('$.') else expression.split('.'))
+        else:
+            self.keys = None
+
+    def find(self, passed_data):
+        """Returns a list of matches like jsonpath.jsonpath(), or False when nothing matches"""
+        if self.keys is None:
+            return jsonpath.jsonpath(passed_data, self.expression)
+        value = passed_data
+        for key in self.keys:
+            if not isinstance(value, dict) or key not in value:
+                return False
+            value = value[key]
+        return [value]
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_query(passed_key):
+    """Returns the cached JsonQuery for 'passed_key'"""
+    return JsonQuery(passed_key)
+
+
+class JsonArrayStream:
+    """
+    Incrementally decodes the elements of one top-level array field of a JSON object from an iterator of byte
+    chunks, such as requests' Response.iter_content(). Only the element being decoded is held in memory.
+    """
+
+    _decoder = json.JSONDecoder()
+    _whitespace = ' \t\n\r'
+
+    def __init__(self, passed_chunks, passed_key):
+        self.key = passed_key
+        self._chunks = iter(passed_chunks)
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _read(self, passed_min_available=1):
+        """Reads chunks until 'passed_min_available' unconsumed characters are buffered or the stream ends"""
+        pieces = [self._buffer[self._pos:]]
+        available = len(pieces[0])
+        while available < passed_min_available and not self._eof:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._eof = True
+                text = self._text_decoder.decode(b'', final=True)
+            else:
+                text = self._text_decoder.decode(chunk)
+            pieces.append(text)
+            available += len(text)
+        self._buffer = ''.join(pieces)
+        self._pos = 0
+
+    def _peek(self):
+        """Skips whitespace and returns the next character, or '' at the end of the stream"""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in self._whitespace:
+                self._pos += 1
+            if self._pos < len(self._buffer) or self._eof:
+                return self._buffer[self._pos:self._pos + 1]
+            self._read()
+
+    def _expect(self, passed_char):
+        found = self._peek()
+        if found != passed_char:
+            raise ResponseError(f'Invalid JSON stream: expected \'{passed_char}\' but found \'{found}\'.')
+        self._pos += 1
+
+    def _value(self):
+        """Decodes the next complete JSON value, reading more of the stream until it is complete"""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A number at the very end of the buffer may continue in the next chunk.
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except JSONDecodeError:
+                if self._eof:
+                    raise
+            # Double the buffered text before retrying so large values are not re-parsed once per chunk.
+            self._read(2 * (len(self._buffer) - self._pos) + 1)
+
+    def __iter__(self):
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._value()
+            self._expect(':')
+            if key == self.key and self._peek() == '[':
+                self._pos += 1
+                if self._peek() == ']':
+                    self._pos += 1
+                else:
+                    while True:
+                        yield self._value()
+                        if self._peek() == ']':
+                            self._pos += 1
+                            break
+                        self._expect(',')
+            else:
+                self._value()
+            if self._peek() == '}':
+                return
+            self._expect(',')
+
+
+# Log messages are formatted lazily; bodies longer than this many characters are truncated when logged.
+# Set QUOTES_LOG_BODY_LIMIT=0 to log bodies in full.
+LOG_BODY_LIMIT = int(os.environ.get('QUOTES_LOG_BODY_LIMIT', '500'))
+
+
+def _abbreviate(passed_value, passed_limit):
+    """Returns str(passed_value) cut to about 'passed_limit' characters without rendering the rest of it"""
+    if passed_limit <= 0:
+        return str(passed_value)
+    if isinstance(passed_value, (list, tuple, dict)):
+        is_dict = isinstance(passed_value, dict)
+        parts = []
+        used = 0
+        for item in (passed_value.items() if is_dict else passed_value):
+            if used >= passed_limit:
+                parts.append(f'... ({len(passed_value)} items)')
+                break
+            if is_dict:
+                part = f'{item[0]!r}: {_abbreviate(item[1], passed_limit - used)}'
+            else:
+                part = _abbreviate(item, passed_limit - used)
+            parts.append(part)
+            used += len(part) + 2
+        return ('{%s}' if is_dict else '[%s]') % ', '.join(parts)
+    text = passed_value if isinstance(passed_value, str) else str(passed_value)
+    if len(text) <= passed_limit:
+        return text
+    return f'{text[:passed_limit]}... ({len(text)} characters)'
+
+
+class _Abbreviated:
+    """Wraps a log argument so it is only rendered, and truncated to LOG_BODY_LIMIT, if the record is emitted"""
+
+    __slots__ = ('value',)
+
+    def __init__(self, passed_value):
+        self.value = passed_value
+
+    def __str__(self):
+        return _abbreviate(self.value, LOG_BODY_LIMIT)
+
+
+# Helper methods
+def _check_if_int(passed_value):
+    """Checks if the passed value is an integer"""
+    if not isinstance(passed_value, int):
+        raise ResponseError(f'Invalid value: \'{passed_value}\' is not an int.')
+
+
+def _get_status_code(passed_response):
+    """Returns the status code of the passed response"""
+    passed_response_status_code = passed_response.status_code
+    _check_if_int(passed_response_status_code)
+    if passed_response:
+        logger.info('Operation success!')
+    else:
+        # info level used for reporting status code errors
+        logger.info("An error has occurred: %s", passed_response)
+    return passed_response_status_code
+
+
+def _get_json_from_response(passed_response):
+    """Returns the decoded JSON body of the passed response, decoding it only once per response"""
+    try:
+        return passed_response._decoded_json
+    except AttributeError:
+        json_response = json_codec.loads(passed_response.content)
+        passed_response._decoded_json = json_response
+        return json_response
+
+
+def _get_key_value_from_response(passed_response, passed_key):
+    """Returns the first value of 'passed_key' in the passed response"""
+    try:
+        json_response = _get_json_from_response(passed_response)
+        value = _compile_query(passed_key).find(json_response)
+        logger.debug('%s: %s', passed_key, _Abbreviated(value[0]))
+        return value[0]
+    except ValueError:  # JSONDecodeError is a ValueError subclass
+        logger.fatal('Invalid response body returned from server. Expecting JSON. Found:\n%s',
+                     _Abbreviated(passed_response.text))
+    except TypeError:
+        logger.fatal('Passed key \'%s\' was not found in response:\n%s', passed_key, _Abbreviated(passed_response.text))
+
+
+def _get_first_value_for_key_from_response_data(passed_response, passed_key):
+    """Returns the first value for 'passed_key' in the passed response"""
+    value = _compile_query(passed_key).find(passed_response)
+    logger.debug('value: %s', _Abbreviated(value[0]))
+    return value[0]
+
+
+def _get_all_values_for_key_from_response_data(passed_response, passed_key):
+    """Returns a list of all values for 'passed_key' in the passed response"""
+    try:
+        ids = [elem[passed_key] for elem in passed_response]
+        if logger.isEnabledFor(logging.DEBUG):
+            for value in ids:
+                logger.debug('elem[%s]: %s', passed_key, _Abbreviated(value))
+        return ids
+    except KeyError:
+        logger.fatal('Key \'%s\' was not found in the response data:\n%s', passed_key, _Abbreviated(passed_response))
+
+
+def _get_ids_from_server(session, send_request):
+    response = send_request.get(session)
+    response_data = _get_key_value_from_response(response, 'data')
+    logger.debug('initial_get_response_data: %s', _Abbreviated(response_data))
+    ids = _get_all_values_for_key_from_response_data(response_data, 'id')
+    return ids
+
+
+def _iter_quotes_from_server(session, send_request, page_size=None):
+    """
+    Yields (id, text) pairs from a streamed GET /quotes without loading the whole body into memory, or from
+    parallel page reads with QuotePages when a page size is given here or in SendRequest.page_size
+    """
+    page_size = SendRequest.page_size if page_size is None else page_size
+    if page_size:
+        yield from QuotePages(session, send_request, page_size=page_size)
+        return
+    with send_request.get_stream(session) as response:
+        assert_status(response, 200)
+        for elem in JsonArrayStream(response.iter_content(SendRequest.stream_chunk_size), 'data'):
+            yield elem['id'], elem['text']
+
+
+def _get_snapshot_from_server(session, send_request, keep_texts=False, page_size=None):
+    """Returns a compact StoreSnapshot built from a streamed or paged GET /quotes"""
+    return StoreSnapshot.from_pairs(_iter_quotes_from_server(session, send_request, page_size=page_size),
+                                    keep_texts=keep_texts)
+
+
+def _get_index_from_server(session, send_request):
+    """Returns a QuoteIndex built from a single GET /quotes"""
+    response = send_request.get(session)
+    response_data = _get_key_value_from_response(response, 'data')
+    return QuoteIndex(response_data)
+
+
+def _build_post_payload(passed_json_string):
+    """Returns the request body SendRequest.post sends for 'passed_json_string'"""
+    try:
+        if passed_json_string == '':  # To allow for sending am empty JSON payload to the endpoint.
+            request_json = SendRequest.empty_data.copy()
+        else:
+            request_json = json_codec.loads(passed_json_string)
+    except JSONDecodeError:  # This is an ugly solution to allow passing of invalid JSON payload to the endpoint.
+        request_json = passed_json_string
+    except ValueError:
+        raise ResponseError(f'Invalid value: \'{passed_json_string}\' is not a valid json.')
+    return json_codec.dumps(request_json)
+
+
+def _ensure_pool_size(passed_session, passed_url, passed_pool_size):
+    """Mounts a larger connection pool for 'passed_url' on the session if the current one is too small"""
+    adapter = passed_session.get_adapter(passed_url)
+    if getattr(adapter, '_pool_maxsize', passed_pool_size) < passed_pool_size:
+        logger.debug('Growing the connection pool for %s to %s', passed_url, passed_pool_size)
+        adapter_class = type(adapter) if isinstance(adapter, HTTPAdapter) else HTTPAdapter
+        passed_session.mount(passed_url, adapter_class(pool_maxsize=passed_pool_size, max_retries=adapter.max_retries))
+
+
+def assert_status(passed_response, expected_status):
+    assert passed_response.status_code == expected_status, "Expected: {} actual: {}. Response error: {}".format(
+        expected_status, passed_response.status_code, _get_key_value_from_response(passed_response, 'error'))
+
+
+class ResponseError(Exception):
+    """An exception class for the REST API Response"""
+
+
+class QuoteIndex:
+    """An id-indexed view of the 'data' list of a GET /quotes response.
+
+    The index is built in a single pass; id lookups and membership checks are O(1) afterwards.
+    """
+
+    def __init__(self, passed_response_data):
+        self.ids = []
+        self.entries = {}
+        for elem in passed_response_data:
+            self.ids.append(elem['id'])
+            self.entries[elem['id']] = elem
+        self.id_set = set(self.entries)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, passed_id):
+        return passed_id in self.id_set
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def get(self, passed_id):
+        """Returns the entry for 'passed_id', or None if it is not present"""
+        return self.entries.get(passed_id)
+
+    def get_text(self, passed_id):
+        """Returns the text of the entry for 'passed_id', or None if it is not present"""
+        entry = self.entries.get(passed_id)
+        return None if entry is None else entry['text']
+
+
+class QuotePages:
+    """
+    Iterates over GET /quotes one page at a time and yields (id, text) pairs in server order.
+
+    After the first page, up to 'concurrency' further pages are fetched in parallel while earlier ones are consumed,
+    so at most 'concurrency' + 1 pages are held at once; build a StoreSnapshot from the pairs to check sortedness
+    and duplicates. Pages are read by offset, so 'consistent' turns False when the store changed between two pages
+    (their ETags differ) and the pages may overlap or miss quotes. A server that ignores the page parameters answers
+    the first request with the whole store, which is yielded as a single page.
+    """
+
+    def __init__(self, passed_session, passed_send_request, page_size=1000, concurrency=4, min_id=None, max_id=None):
+        if page_size < 1:
+            raise ValueError(f'page_size must be at least 1, not {page_size}.')
+        self.session = passed_session
+        self.send_request = passed_send_request
+        self.page_size = page_size
+        self.concurrency = concurrency
+        self.min_id = min_id
+        self.max_id = max_id
+        self.count = 0
+        self.pages = 0
+        self.total = None
+        self.consistent = True
+        self._etag = None
+
+    def _fetch(self, passed_offset):
+        response = self.send_request.get_page(self.session, limit=self.page_size, offset=passed_offset,
+                                              min_id=self.min_id, max_id=self.max_id)
+        assert_status(response, 200)
+        return response
+
+    def _read_page(self, passed_response):
+        self.pages += 1
+        etag = passed_response.headers.get('ETag')
+        if self._etag is None:
+            self._etag = etag
+        elif etag != self._etag:
+            self.consistent = False
+        for elem in _get_key_value_from_response(passed_response, 'data'):
+            self.count += 1
+            yield elem['id'], elem['text']
+
+    def __iter__(self):
+        first_response = self._fetch(0)
+        self.total = _get_json_from_response(first_response).get('total')
+        yield from self._read_page(first_response)
+        if self.total is None:
+            return
+        offsets = iter(range(self.page_size, self.total, self.page_size))
+        _ensure_pool_size(self.session, SendRequest.base_url, self.concurrency)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            pending = deque(executor.submit(self._fetch, offset)
+                            for _, offset in zip(range(self.concurrency), offsets))
+            while pending:
+                response = pending.popleft().result()
+                offset = next(offsets, None)
+                if offset is not None:
+                    pending.append(executor.submit(self._fetch, offset))
+                yield from self._read_page(response)
+
+
+class BulkPostResult:
+    """The outcome of SendRequest.post_many.
+
+    'ids' holds the created id for each submitted text in submission order, with None where the request failed.
+    'failures' maps the position of each failed text to the error response or the raised exception.
+    """
+
+    def __init__(self, passed_count):
+        self.ids = [None] * passed_count
+        self.failures = {}
+
+    @property
+    def created_ids(self):
+        """The ids of the successfully created quotes, in submission order"""
+        return [new_id for new_id in self.ids if new_id is not None]
+
+
+class ResponseCache:
+    """
+    An HTTP cache of GET responses keyed by URL, revalidated with ETag / If-None-Match.
+    A 304 answer returns the cached response object, whose decoded JSON is cached on it as well, so an unchanged
+    collection is neither downloaded nor decoded again. Responses without an ETag are never cached.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def fetch(self, passed_url, passed_send):
+        """Returns the response for 'passed_url'; 'passed_send' is called with the conditional request headers"""
+        with self._lock:
+            entry = self._entries.get(passed_url)
+        response = passed_send({'If-None-Match': entry[0]} if entry is not None else None)
+        with self._lock:
+            if response.status_code == 304 and entry is not None:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            etag = response.headers.get('ETag')
+            if response.status_code == 200 and etag:
+                self._entries[passed_url] = (etag, response)
+            else:
+                self._entries.pop(passed_url, None)
+        return response
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class ConnectionManager:
+    """Owns a single keep-alive requests.Session with an explicit connection pool size and retry policy."""
+
+    pool_size = 10
+    max_retries = 3
+    backoff_factor = 0.1
+
+    def __init__(self, pool_size=None, max_retries=None, backoff_factor=None):
+        self.pool_size = ConnectionManager.pool_size if pool_size is None else pool_size
+        self.max_retries = ConnectionManager.max_retries if max_retries is None else max_retries
+        self.backoff_factor = ConnectionManager.backoff_factor if backoff_factor is None else backoff_factor
+        # Only connection failures are retried; read and status retries would hide server bugs and repeat POSTs.
+        retry = Retry(total=self.max_retries, connect=self.max_retries, read=0, status=0,
+                      backoff_factor=self.backoff_factor, raise_on_status=False)
+        adapter = TimingHTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Connection'] = 'keep-alive'
+
+    def close(self):
+        self.session.close()
+
+
+class SendReset:
+    """Reset the API and make session and send_request available."""
+
+    def __init__(self, passed_session=None):
+        session = requests.Session() if passed_session is None else passed_session
+        send_request = SendRequest()
+        response = send_request.reset(session)
+        response_status_code = _get_status_code(response)
+        response_ok = _get_key_value_from_response(response, 'ok')
+        assert response_status_code == 200
+        assert response_ok is True
+        self.session = session
+        self.send_request = send_request
+
+
+class SeededStates:
+    """
+    Restores seeded store states, such as "15 quotes", that are built once per session.
+    The first restore of a state resets the store, POSTs the generated quotes and saves a server snapshot; every
+    later restore of it is a single POST /snapshots/<id>. Servers without snapshots are reset and reseeded each time.
+    """
+
+    def __init__(self, passed_session, passed_send_request=None):
+        self.session = passed_session
+        self.send_request = SendRequest() if passed_send_request is None else passed_send_request
+        self.snapshot_ids = {}
+        self.supported = True
+
+    def restore(self, passed_count, seed=0):
+        """Restores a store of 'passed_count' quotes: the initial ones, then QuoteGenerator(seed) sentences"""
+        key = passed_count, seed
+        snapshot_id = self.snapshot_ids.get(key)
+        if snapshot_id is not None:
+            response = self.send_request.restore_snapshot(self.session, snapshot_id)
+            if response.status_code == 200:
+                return
+            # The server lost the snapshot, e.g. it was restarted; seed the state again.
+            logger.warning('Snapshot %s of %s quotes could not be restored: %s', snapshot_id, passed_count,
+                           response.status_code)
+            del self.snapshot_ids[key]
+        self._seed(passed_count, seed)
+        if self.supported:
+            response = self.send_request.create_snapshot(self.session)
+            if response.status_code == 201:
+                self.snapshot_ids[key] = _get_key_value_from_response(response, 'data')['id']
+            else:
+                logger.info('The server does not support snapshots (status %s); reseeding for every test',
+                            response.status_code)
+                self.supported = False
+
+    def _seed(self, passed_count, passed_seed):
+        assert_status(self.send_request.reset(self.session), 200)
+        initial_count = len(_get_ids_from_server(self.session, self.send_request))
+        texts = QuoteGenerator(passed_seed).sentences(max(passed_count - initial_count, 0))
+        post_result = self.send_request.post_many(self.session, texts)
+        assert not post_result.failures, f'Failed POST /quotes requests: {post_result.failures}'
+
+
+class SendRequest:
+    """Send API requests to 'quotes_server .py' generated url endpoints."""
+
+    base_url = "http://127.0.0.1:6543"
+    quotes_endpoint = "quotes"
+    reset_endpoint = "reset"
+    snapshots_endpoint = "snapshots"
+    headers = {
+        'Content-Type': 'application/json',
+        'Accept': '*/*'
+    }
+    empty_data = {}
+    stream_chunk_size = 64 * 1024
+    # Callables that receive a RequestTiming after every request, e.g. request_timing.TimingRecorder instances.
+    hooks = []
+    # A traffic_replay.TrafficRecorder that every request and response is appended to, or None.
+    recorder = None
+    # Quotes per page for full-store reads with QuotePages (see QUOTES_PAGE_SIZE), or None for one streamed GET.
+    page_size = None
+    # Whether new instances cache GET /quotes with a ResponseCache (opt-in, see QUOTES_HTTP_CACHE).
+    use_cache = False
+
+    def __init__(self, use_cache=None):
+        use_cache = SendRequest.use_cache if use_cache is None else use_cache
+        self.cache = ResponseCache() if use_cache else None
+
+    def _send(self, passed_session, passed_method, passed_endpoint, passed_url, **kwargs):
+        """
+        Send a request through the session, append it to the recorder if one is set and report its RequestTiming
+        to every registered hook. Any request other than GET may change the store and clears this client's cache.
+        """
+        if self.cache is not None and passed_method != 'GET':
+            self.cache.clear()
+        if not SendRequest.hooks and SendRequest.recorder is None:
+            return passed_session.request(passed_method, passed_url, **kwargs)
+        reset_connect_time()
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            response = passed_session.request(passed_method, passed_url, **kwargs)
+        except requests.RequestException:
+            self._report(RequestTiming(passed_method, passed_endpoint, None, time.perf_counter() - start,
+                                       connect=get_connect_time()))
+            raise
+        total = time.perf_counter() - start
+        if SendRequest.recorder is not None and kwargs.get('stream'):
+            SendRequest.recorder.record_stream(response, started_at, total)
+        elif SendRequest.recorder is not None:
+            SendRequest.recorder.record(response, started_at, total)
+        if kwargs.get('stream'):
+            response_bytes = int(response.headers.get('Content-Length') or 0)
+        else:
+            response_bytes = len(response.content)
+        self._report(RequestTiming(passed_method, passed_endpoint, response.status_code, total,
+                                   time_to_first_byte=response.elapsed.total_seconds(), connect=get_connect_time(),
+                                   request_bytes=len(response.request.body or b''), response_bytes=response_bytes))
+        return response
+
+    def _report(self, passed_timing):
+        for hook in SendRequest.hooks:
+            hook(passed_timing)
+
+    def reset(self, passed_session):
+        # Send POST Request
+        logger.info("POST url: %s/%s", SendRequest.base_url, SendRequest.reset_endpoint)
+        response = self._send(passed_session, 'POST', SendRequest.reset_endpoint,
+                              f'{SendRequest.base_url}/{SendRequest.reset_endpoint}',
+                              headers=SendRequest.headers, data=json_codec.dumps(SendRequest.empty_data))
+        return response
+
+    def create_snapshot(self, passed_session):
+        # Send POST Request; the local server saves the store and answers with the snapshot id
+        url = f'{SendRequest.base_url}/{SendRequest.snapshots_endpoint}'
+        logger.info("POST url: %s", url)
+        response = self._send(passed_session, 'POST', SendRequest.snapshots_endpoint, url)
+        return response
+
+    def restore_snapshot(self, passed_session, passed_snapshot_id):
+        # Send POST Request to restore a saved snapshot
+        url = f'{SendRequest.base_url}/{SendRequest.snapshots_endpoint}/{passed_snapshot_id}'
+        logger.info("POST url: %s", url)
+        response = self._send(passed_session, 'POST', f'{SendRequest.snapshots_endpoint}/<id>', url)
+        return response
+
+    def delete_snapshot(self, passed_session, passed_snapshot_id):
+        # Send DELETE Request
+        url = f'{SendRequest.base_url}/{SendRequest.snapshots_endpoint}/{passed_snapshot_id}'
+        logger.info("DELETE url: %s", url)
+        response = self._send(passed_session, 'DELETE', f'{SendRequest.snapshots_endpoint}/<id>', url)
+        return response
+
+    def get(self, passed_session):
+        # Send GET Request; with a cache, an unchanged collection is answered with 304 and served from the cache
+        url = f"{SendRequest.base_url}/{SendRequest.quotes_endpoint}"
+        logger.info("GET url: %s", url)
+        if self.cache is None:
+            return self._send(passed_session, 'GET', SendRequest.quotes_endpoint, url)
+        return self.cache.fetch(url, lambda headers: self._send(passed_session, 'GET', SendRequest.quotes_endpoint,
+                                                                url, headers=headers))
+
+    def get_page(self, passed_session, limit=None, offset=None, min_id=None, max_id=None):
+        # Send GET Request for one page of the quotes with ids in [min_id, max_id]; parameters left None are not sent
+        url = f"{SendRequest.base_url}/{SendRequest.quotes_endpoint}"
+        parameters = (('limit', limit), ('offset', offset), ('min_id', min_id), ('max_id', max_id))
+        params = {name: value for name, value in parameters if value is not None}
+        logger.info("GET url: %s with %s", url, params)
+        response = self._send(passed_session, 'GET', SendRequest.quotes_endpoint, url, params=params)
+        return response
+
+    def get_stream(self, passed_session):
+        # Send GET Request; the body is left unread so it can be decoded incrementally with JsonArrayStream
+        logger.info("GET url: %s/%s (streamed)", SendRequest.base_url, SendRequest.quotes_endpoint)
+        response = self._send(passed_session, 'GET', SendRequest.quotes_endpoint,
+                              f"{SendRequest.base_url}/{SendRequest.quotes_endpoint}", stream=True)
+        return response
+
+    def get_id(self, passed_session, passed_id):
+        # Send GET Request
+        logger.info("GET url: %s/%s/%s", SendRequest.base_url, SendRequest.quotes_endpoint, passed_id)
+        _check_if_int(passed_id)
+        response = self._send(passed_session, 'GET', f"{SendRequest.quotes_endpoint}/<id>",
+                              f"{SendRequest.base_url}/{SendRequest.quotes_endpoint}/{passed_id}")
+        return response
+
+    def delete(self, passed_session, passed_id=''):
+        # Send DELETE Request
+        logger.info("DELETE url: %s/%s/%s", SendRequest.base_url, SendRequest.quotes_endpoint, passed_id)
+        response = self._send(passed_session, 'DELETE', f"{SendRequest.quotes_endpoint}/<id>",
+                              f"{SendRequest.base_url}/{SendRequest.quotes_endpoint}/{passed_id}")
+        return response
+
+    def post(self, passed_session, passed_json_string=''):
+        # Send POST Request
+        logger.info("POST url: %s/%s with data %s", SendRequest.base_url, SendRequest.quotes_endpoint,
+                    _Abbreviated(passed_json_string))
+        response = self._send(passed_session, 'POST', SendRequest.quotes_endpoint,
+                              f"{SendRequest.base_url}/{SendRequest.quotes_endpoint}",
+                              headers=SendRequest.headers, data=_build_post_payload(passed_json_string))
+        return response
+
+    def post_quote(self, passed_session, passed_text):
+        # Send POST Request; the payload is serialized straight to bytes with no intermediate JSON string parsing
+        url = f"{SendRequest.base_url}/{SendRequest.quotes_endpoint}"
+        logger.info("POST url: %s with a %d character quote", url, len(passed_text))
+        payload = encode_quote_payload(passed_text)
+        response = self._send(passed_session, 'POST', SendRequest.quotes_endpoint, url,
+                              headers=SendRequest.headers, data=payload)
+        return response
+
+    def post_raw(self, passed_session, passed_payload):
+        # Send POST Request with a pre-encoded payload, which is sent exactly as given (valid JSON or not)
+        url = f"{SendRequest.base_url}/{SendRequest.quotes_endpoint}"
+        logger.info("POST url: %s with a %d byte raw payload", url, len(passed_payload))
+        response = self._send(passed_session, 'POST', SendRequest.quotes_endpoint, url,
+                              headers=SendRequest.headers, data=passed_payload)
+        return response
+
+    def post_many(self, passed_session, passed_texts, concurrency=8):
+        """
+        Send one POST /quotes per text, 'concurrency' requests at a time over the session's connection pool.
+        Failed requests are recorded in the returned BulkPostResult and do not stop the rest of the batch.
+        """
+        texts = list(passed_texts)
+        logger.info("POST url: %s/%s for %d quotes with concurrency %d", SendRequest.base_url,
+                    SendRequest.quotes_endpoint, len(texts), concurrency)
+        _ensure_pool_size(passed_session, SendRequest.base_url, concurrency)
+
+        result = BulkPostResult(len(texts))
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(self.post_quote, passed_session, text) for text in texts]
+            for position, future in enumerate(futures):
+                try:
+                    response = future.result()
+                except requests.RequestException as ex:
+                    logger.error('POST of quote %d failed: %s', position, ex)
+                    result.failures[position] = ex
+                    continue
+                new_id = None
+                if response.status_code == 201:
+                    response_data = _get_key_value_from_response(response, 'data')
+                    new_id = response_data.get('id') if isinstance(response_data, dict) else None
+                if new_id is None:
+                    logger.error('POST of quote %d failed with status %s', position, response.status_code)
+                    result.failures[position] = response
+                else:
+                    result.ids[position] = new_id
+        return result
+
+    def custom_method_endpoint(self, passed_session, passed_endpoint, passed_method):
+        print(f'passed_method: {passed_method}')
+
+        url = SendRequest.base_url + '/' + passed_endpoint
+        print(f'url: {url}')
+        response = None
+        if passed_method == 'GET':
+            logger.info("GET url: %s", url)
+            response = self._send(passed_session, 'GET', passed_endpoint, url)
+        elif passed_method == 'POST':
+            logger.info("POST url: %s", url)
+            response = self._send(passed_session, 'POST', passed_endpoint, url)
+        elif passed_method == 'PUT':
+            logger.info("PUT url: %s", url)
+            response = self._send(passed_session, 'PUT', passed_endpoint, url)
+        elif passed_method == 'DELETE':
+            logger.info("DELETE url: %s", url)
+            response = self._send(passed_session, 'PUT', passed_endpoint, url)
+        elif passed_method == 'PATCH':
+            logger.info("PATCH url: %s", url)
+            response = self._send(passed_session, 'PATCH', passed_endpoint, url)
+        elif passed_method == 'HEAD':
+            logger.info("HEAD url: %s", url)
+            response = self._send(passed_session, 'HEAD', passed_endpoint, url, allow_redirects=False)
+        elif passed_method == 'OPTIONS':
+            logger.info("OPTIONS url: %s", url)
+            response = self._send(passed_session, 'OPTIONS', passed_endpoint, url)
+        else:
+            logger.error('Unknown/Unsupported method: \'%s\'.', passed_method)
+        return response
+
+
+if __name__ == "__main__":
+    print("Pytest Skills Evaluation against " + SendRequest.base_url)
+    cur_session = requests.Session()
+    request = SendRequest()
+    operations = [
+        request.reset,
+        request.get,
+        request.get_id,
+        request.delete,
+        request.post,
+        request.custom_method_endpoint
+    ]
+    print('Available operations: ')
+    for i, operation in enumerate(operations, start=1):
+        print(f"{i}: {operation.__name__}")
+    try:
+        print('\nGET: ')
+        print(json_codec.dumps_pretty(_get_key_value_from_response(operations[1](cur_session), 'data')))
+    except ResponseError as ex:
+        print(ex)
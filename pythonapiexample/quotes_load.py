@@ -0,0 +1,630 @@
+"""
+Load and soak testing for the quotes API with a mixed workload.
+
+Worker threads send a weighted mix of operations through SendRequest for a fixed duration, either at a fixed
+arrival rate (--rate, an open model) or as fast as a fixed number of workers allows (--concurrency only, a closed
+model). In rate mode each latency is measured from the request's intended start time, so queueing behind a slow
+response is counted (coordinated omission correction); in closed mode --expected-interval-ms back-fills the
+requests a stalled worker failed to send. While the load runs, a checker thread verifies that GET /quotes has no
+duplicate ids, is sorted, never contains a deleted id, and that between checks no text changed and no quote
+disappeared without a DELETE.
+
+One process is limited by the GIL long before a fast server is saturated. With --processes N the store is seeded
+once, then N worker processes each run their own pooled client on a disjoint share of the seeded ids and of the
+arrival rate, and send their latency histograms back over a pipe. The parent merges them into one report and runs
+the invariant checks, except the removed-without-DELETE check, as the parent does not see the workers' DELETEs
+until they finish.
+
+Example:
+    $ python3 -m pythonapiexample.quotes_load --mix get_id=80,post=10,delete=5,get_all=5 --rate 200 --duration 60
+    $ python3 -m pythonapiexample.quotes_load --processes 8 --concurrency 8 --duration 60
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from pythonapiexample.quotes_client import (ConnectionManager, SendRequest, _get_key_value_from_response,
+                                            _get_snapshot_from_server)
+from pythonapiexample.request_timing import LatencyHistogram, _format_number, _to_ms
+from pythonapiexample.store_snapshot import StoreSnapshot
+
+logger = logging.getLogger(__name__)
+
+OPERATIONS = ('get_id', 'post', 'delete', 'get_all')
+DEFAULT_MIX = 'get_id=80,post=10,delete=5,get_all=5'
+
+
+def parse_mix(passed_mix):
+    """Parses 'op=weight,...' into a dict of operation weights"""
+    mix = {}
+    for part in passed_mix.split(','):
+        operation, _, weight = part.partition('=')
+        operation = operation.strip()
+        if operation not in OPERATIONS:
+            raise ValueError(f'Unknown operation: \'{operation}\'. Expected one of {OPERATIONS}.')
+        mix[operation] = float(weight)
+    if sum(mix.values()) <= 0:
+        raise ValueError(f'The workload mix \'{passed_mix}\' has no positive weights.')
+    return mix
+
+
+class LoadConfig:
+    """Settings for one load run."""
+
+    def __init__(self, mix=None, duration=60.0, rate=None, concurrency=16, store_size=100,
+                 invariant_interval=1.0, expected_interval=None, reset=True, seed=None):
+        self.mix = parse_mix(DEFAULT_MIX) if mix is None else mix
+        self.duration = duration
+        self.rate = rate
+        self.concurrency = concurrency
+        self.store_size = store_size
+        self.invariant_interval = invariant_interval
+        self.expected_interval = expected_interval
+        self.reset = reset
+        self.seed = seed
+
+    def as_dict(self):
+        return {
+            'mix': self.mix,
+            'duration': self.duration,
+            'rate': self.rate,
+            'concurrency': self.concurrency,
+            'store_size': self.store_size,
+            'invariant_interval': self.invariant_interval,
+            'expected_interval': self.expected_interval,
+            'reset': self.reset,
+            'seed': self.seed,
+        }
+
+
+class LoadState:
+    """The ids the load generator believes are stored or deleted, shared by all worker threads."""
+
+    def __init__(self, passed_ids):
+        self._lock = threading.Lock()
+        self._live_ids = list(passed_ids)
+        self._positions = {quote_id: position for position, quote_id in enumerate(self._live_ids)}
+        self.deleting_ids = set()
+        self.deleted_ids = set()
+
+    def random_live_id(self, passed_random):
+        with self._lock:
+            return passed_random.choice(self._live_ids) if self._live_ids else None
+
+    def add(self, passed_id):
+        with self._lock:
+            if passed_id not in self._positions:
+                self._positions[passed_id] = len(self._live_ids)
+                self._live_ids.append(passed_id)
+
+    def take_random_live_id(self, passed_random):
+        """Removes and returns a random live id so that no two workers delete the same quote"""
+        with self._lock:
+            if not self._live_ids:
+                return None
+            position = passed_random.randrange(len(self._live_ids))
+            quote_id = self._live_ids[position]
+            last_id = self._live_ids.pop()
+            if last_id != quote_id:
+                self._live_ids[position] = last_id
+                self._positions[last_id] = position
+            del self._positions[quote_id]
+            self.deleting_ids.add(quote_id)
+            return quote_id
+
+    def mark_deleted(self, passed_id):
+        with self._lock:
+            self.deleting_ids.discard(passed_id)
+            self.deleted_ids.add(passed_id)
+
+    def is_deleted_or_deleting(self, passed_id):
+        with self._lock:
+            return passed_id in self.deleted_ids or passed_id in self.deleting_ids
+
+    def gone_snapshot(self):
+        """Returns the ids that are deleted or have a DELETE in flight"""
+        with self._lock:
+            return self.deleted_ids | self.deleting_ids
+
+    def deleted_snapshot(self):
+        with self._lock:
+            return set(self.deleted_ids)
+
+    def live_snapshot(self):
+        with self._lock:
+            return list(self._live_ids)
+
+
+class OperationStats:
+    """Latency histograms and outcome counts for one operation."""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.service_time = LatencyHistogram()
+        self.statuses = Counter()
+        self.errors = 0
+
+    def merge(self, other):
+        self.latency.merge(other.latency)
+        self.service_time.merge(other.service_time)
+        self.statuses.update(other.statuses)
+        self.errors += other.errors
+        return self
+
+    def to_dict(self):
+        return {
+            'latency': self.latency.to_dict(),
+            'service_time': self.service_time.to_dict(),
+            'statuses': dict(self.statuses),
+            'errors': self.errors,
+        }
+
+    @classmethod
+    def from_dict(cls, passed_dict):
+        stats = cls()
+        stats.latency = LatencyHistogram.from_dict(passed_dict['latency'])
+        stats.service_time = LatencyHistogram.from_dict(passed_dict['service_time'])
+        stats.statuses = Counter(passed_dict['statuses'])
+        stats.errors = passed_dict['errors']
+        return stats
+
+
+class LoadResult:
+    """The outcome of a load run: per-operation stats and invariant check results."""
+
+    max_violation_messages = 20
+
+    def __init__(self):
+        self.operations = {}
+        self.duration = 0.0
+        self.invariant_checks = 0
+        self.violations = []
+        self.violation_count = 0
+
+    def stats_for(self, passed_operation):
+        stats = self.operations.get(passed_operation)
+        if stats is None:
+            stats = self.operations[passed_operation] = OperationStats()
+        return stats
+
+    def add_violation(self, passed_message):
+        logger.error('Invariant violated: %s', passed_message)
+        self.violation_count += 1
+        if len(self.violations) < LoadResult.max_violation_messages:
+            self.violations.append(passed_message)
+
+    @property
+    def requests(self):
+        return sum(stats.service_time.count for stats in self.operations.values())
+
+    def merge(self, other):
+        for operation, stats in other.operations.items():
+            self.stats_for(operation).merge(stats)
+        self.duration = max(self.duration, other.duration)
+        self.invariant_checks += other.invariant_checks
+        self.violation_count += other.violation_count
+        room = LoadResult.max_violation_messages - len(self.violations)
+        self.violations.extend(other.violations[:max(room, 0)])
+        return self
+
+    def to_dict(self):
+        return {
+            'operations': {operation: stats.to_dict() for operation, stats in self.operations.items()},
+            'duration': self.duration,
+            'invariant_checks': self.invariant_checks,
+            'violations': self.violations,
+            'violation_count': self.violation_count,
+        }
+
+    @classmethod
+    def from_dict(cls, passed_dict):
+        result = cls()
+        result.operations = {operation: OperationStats.from_dict(stats)
+                             for operation, stats in passed_dict['operations'].items()}
+        result.duration = passed_dict['duration']
+        result.invariant_checks = passed_dict['invariant_checks']
+        result.violations = list(passed_dict['violations'])
+        result.violation_count = passed_dict['violation_count']
+        return result
+
+    def report(self):
+        """Returns a JSON serializable summary with throughput and latency percentiles in milliseconds"""
+        operations = {}
+        for operation, stats in sorted(self.operations.items()):
+            operations[operation] = {
+                'requests': stats.service_time.count,
+                'errors': stats.errors,
+                'requests_per_second': stats.service_time.count / self.duration if self.duration else None,
+                'latency_ms': {name: _to_ms(stats.latency.percentile(percent))
+                               for name, percent in (('p50', 50), ('p95', 95), ('p99', 99), ('p999', 99.9))},
+                'service_time_p99_ms': _to_ms(stats.service_time.percentile(99)),
+                'max_ms': _to_ms(stats.latency.max),
+                'statuses': dict(stats.statuses),
+            }
+        return {
+            'requests': self.requests,
+            'duration_s': self.duration,
+            'requests_per_second': self.requests / self.duration if self.duration else None,
+            'operations': operations,
+            'invariant_checks': self.invariant_checks,
+            'violation_count': self.violation_count,
+            'violations': self.violations,
+        }
+
+
+class LoadGenerator:
+    """Runs a mixed workload against the server at SendRequest.base_url."""
+
+    def __init__(self, config, initial_ids=None):
+        self.config = config
+        # Ids already in the store, e.g. this worker process's share; skips the reset and seeding.
+        self.initial_ids = initial_ids
+        # Whether check_invariants flags quotes removed without a DELETE; other processes' DELETEs are not seen.
+        self.track_removals = True
+        self.send_request = SendRequest()
+        self.connection_manager = ConnectionManager(pool_size=config.concurrency + 1)
+        self.result = LoadResult()
+        self._result_lock = threading.Lock()
+        self._operations = list(config.mix)
+        self._cumulative_weights = []
+        total = 0.0
+        for operation in self._operations:
+            total += config.mix[operation]
+            self._cumulative_weights.append(total)
+        self.state = None
+        self._last_snapshot = None
+
+    def close(self):
+        self.connection_manager.close()
+
+    def _prepare_store(self):
+        if self.initial_ids is not None:
+            self.state = LoadState(self.initial_ids)
+            return
+        session = self.connection_manager.session
+        if self.config.reset:
+            response = self.send_request.reset(session)
+            assert response.status_code == 200, f'POST /reset failed with status {response.status_code}'
+        ids = list(_get_snapshot_from_server(session, self.send_request))
+        missing = self.config.store_size - len(ids)
+        if missing > 0:
+            texts = [f'load seed quote {x}' for x in range(missing)]
+            ids.extend(self.send_request.post_many(session, texts, concurrency=self.config.concurrency).created_ids)
+        self.state = LoadState(ids)
+
+    def _send(self, passed_operation, passed_random, passed_number):
+        """Sends one operation and returns (status, error message or None)"""
+        session = self.connection_manager.session
+        if passed_operation == 'get_all':
+            response = self.send_request.get(session)
+            return response.status_code, None if response.status_code == 200 else 'unexpected status'
+        if passed_operation == 'post':
+            response = self.send_request.post_quote(session, f'load quote {passed_number}')
+            if response.status_code != 201:
+                return response.status_code, 'unexpected status'
+            self.state.add(_get_key_value_from_response(response, 'data')['id'])
+            return response.status_code, None
+        if passed_operation == 'get_id':
+            quote_id = self.state.random_live_id(passed_random)
+            if quote_id is None:
+                return None, None
+            response = self.send_request.get_id(session, quote_id)
+            # A quote deleted by another worker since it was picked is a legitimate 404.
+            if response.status_code == 200 or (response.status_code == 404
+                                               and self.state.is_deleted_or_deleting(quote_id)):
+                return response.status_code, None
+            return response.status_code, f'GET /quotes/{quote_id} returned {response.status_code}'
+        if passed_operation == 'delete':
+            quote_id = self.state.take_random_live_id(passed_random)
+            if quote_id is None:
+                return None, None
+            response = self.send_request.delete(session, quote_id)
+            if response.status_code != 200:
+                return response.status_code, f'DELETE /quotes/{quote_id} returned {response.status_code}'
+            self.state.mark_deleted(quote_id)
+            return response.status_code, None
+        raise ValueError(f'Unknown operation: \'{passed_operation}\'.')
+
+    def _record(self, passed_operation, passed_status, passed_error, passed_latency, passed_service_time):
+        with self._result_lock:
+            stats = self.result.stats_for(passed_operation)
+            if self.config.rate is None:
+                stats.latency.record_corrected(passed_latency, self.config.expected_interval)
+            else:
+                stats.latency.record(passed_latency)
+            stats.service_time.record(passed_service_time)
+            stats.statuses[str(passed_status)] += 1
+            if passed_error is not None:
+                stats.errors += 1
+
+    def _worker(self, passed_worker_number, passed_start, passed_end, passed_counter):
+        rng = random.Random(None if self.config.seed is None else self.config.seed + passed_worker_number)
+        while True:
+            number = next(passed_counter)
+            if self.config.rate is None:
+                intended = time.perf_counter()
+                if intended >= passed_end:
+                    return
+            else:
+                intended = passed_start + number / self.config.rate
+                if intended >= passed_end:
+                    return
+                delay = intended - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            operation = rng.choices(self._operations, cum_weights=self._cumulative_weights)[0]
+            sent = time.perf_counter()
+            try:
+                status, error = self._send(operation, rng, number)
+            except Exception as ex:  # Record transport errors and keep the load running.
+                status, error = None, str(ex)
+            finished = time.perf_counter()
+            if status is None and error is None:
+                continue  # Nothing to operate on, e.g. no live quotes left to delete.
+            if error is not None:
+                logger.debug('%s failed: %s', operation, error)
+            self._record(operation, status, error, finished - intended, finished - sent)
+
+    def check_invariants(self):
+        """
+        Checks GET /quotes once: no duplicate ids, sorted ids, no id deleted before the request was sent, and,
+        compared with the previous check, no changed texts and no quotes removed without a DELETE.
+        """
+        deleted_ids = self.state.deleted_snapshot()
+        response = self.send_request.get(self.connection_manager.session)
+        gone_ids = self.state.gone_snapshot()
+        with self._result_lock:
+            self.result.invariant_checks += 1
+            if response.status_code != 200:
+                self.result.add_violation(f'GET /quotes returned {response.status_code}')
+                return
+            snapshot = StoreSnapshot.from_response_data(_get_key_value_from_response(response, 'data'))
+            if snapshot.duplicate_count:
+                self.result.add_violation(f'{snapshot.duplicate_count} duplicate ids in GET /quotes')
+            unsorted_position = snapshot.unsorted_position()
+            if unsorted_position is not None:
+                self.result.add_violation(f'Ids out of order at position {unsorted_position}: '
+                                          f'{snapshot.ids[unsorted_position:unsorted_position + 2].tolist()}')
+            resurrected_ids = deleted_ids.intersection(snapshot.ids)
+            if resurrected_ids:
+                self.result.add_violation(f'Deleted ids returned by GET /quotes: {sorted(resurrected_ids)[:10]}')
+            if self._last_snapshot is not None and self.track_removals:
+                snapshot_diff = self._last_snapshot.diff(snapshot)
+                if snapshot_diff.changed:
+                    self.result.add_violation(f'Quote texts changed: {snapshot_diff.changed[:10].tolist()}')
+                lost_ids = [quote_id for quote_id in snapshot_diff.removed if quote_id not in gone_ids]
+                if lost_ids:
+                    self.result.add_violation(f'Quotes removed without a DELETE: {lost_ids[:10]}')
+            self._last_snapshot = snapshot
+
+    def _checker(self, passed_stop):
+        while not passed_stop.wait(self.config.invariant_interval):
+            try:
+                self.check_invariants()
+            except Exception as ex:  # A failed check must not stop the load.
+                with self._result_lock:
+                    self.result.add_violation(f'Invariant check failed: {ex}')
+
+    def run(self, final_check=True):
+        """Seeds the store, runs the workload for the configured duration and returns the LoadResult"""
+        self._prepare_store()
+        counter = _Counter()
+        stop = threading.Event()
+        start = time.perf_counter()
+        end = start + self.config.duration
+        workers = [threading.Thread(target=self._worker, args=(number, start, end, counter), daemon=True)
+                   for number in range(self.config.concurrency)]
+        checker = threading.Thread(target=self._checker, args=(stop,), daemon=True)
+        for worker in workers:
+            worker.start()
+        if self.config.invariant_interval:
+            checker.start()
+        for worker in workers:
+            worker.join()
+        stop.set()
+        if checker.is_alive():
+            checker.join()
+        self.result.duration = time.perf_counter() - start
+        if final_check:
+            self.check_invariants()
+        return self.result
+
+
+def _run_worker_process(passed_config, passed_base_url, passed_ids, passed_barrier, passed_connection):
+    """
+    The body of one worker process: runs a LoadGenerator on its share of the ids once every process is ready,
+    then sends its LoadResult and deleted ids to the parent as plain dicts
+    """
+    SendRequest.base_url = passed_base_url
+    generator = None
+    try:
+        generator = LoadGenerator(LoadConfig(**passed_config), initial_ids=passed_ids)
+        passed_barrier.wait(timeout=MultiProcessLoadGenerator.start_timeout)
+        result = generator.run(final_check=False)
+        passed_connection.send({'result': result.to_dict(), 'deleted_ids': sorted(generator.state.deleted_snapshot())})
+    except Exception as ex:  # Report to the parent instead of dying silently.
+        passed_barrier.abort()
+        passed_connection.send({'error': f'{type(ex).__name__}: {ex}'})
+    finally:
+        if generator is not None:
+            generator.close()
+        passed_connection.close()
+
+
+class MultiProcessLoadGenerator:
+    """
+    Runs a LoadGenerator in each of 'processes' worker processes and merges their results.
+
+    The parent seeds the store once and splits the seeded ids and the arrival rate between the workers, which each
+    run config.concurrency threads over their own connection pool. Each worker returns its per-operation
+    LatencyHistograms through a pipe, and the parent adds them bucket by bucket, so the merged percentiles are as
+    exact as those of a single process.
+    """
+
+    # Seconds to wait for every worker process to be ready before giving up.
+    start_timeout = 60.0
+
+    def __init__(self, config, processes):
+        if processes < 1:
+            raise ValueError(f'processes must be at least 1, not {processes}.')
+        self.config = config
+        self.processes = processes
+        self.checker = LoadGenerator(config)
+        self.checker.track_removals = False
+        # The LoadResult of each worker process from the last run, None for a worker that failed.
+        self.worker_results = []
+
+    def close(self):
+        self.checker.close()
+
+    def _worker_config(self, passed_index):
+        config = LoadConfig(**self.config.as_dict())
+        config.rate = None if self.config.rate is None else self.config.rate / self.processes
+        config.seed = None if self.config.seed is None else self.config.seed + passed_index * self.config.concurrency
+        config.invariant_interval = 0
+        config.reset = False
+        return config
+
+    def run(self):
+        """Seeds the store, runs the worker processes for the configured duration and returns the merged LoadResult"""
+        self.checker._prepare_store()
+        ids = self.checker.state.live_snapshot()
+        context = multiprocessing.get_context()
+        barrier = context.Barrier(self.processes + 1)
+        workers = []
+        for index in range(self.processes):
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=_run_worker_process, name=f'quotes-load-{index}', daemon=True,
+                                      args=(self._worker_config(index).as_dict(), SendRequest.base_url,
+                                            ids[index::self.processes], barrier, sender))
+            process.start()
+            sender.close()
+            workers.append((process, receiver))
+
+        result = self.checker.result
+        stop = threading.Event()
+        checker = threading.Thread(target=self.checker._checker, args=(stop,), daemon=True)
+        try:
+            barrier.wait(timeout=MultiProcessLoadGenerator.start_timeout)
+        except threading.BrokenBarrierError:
+            logger.error('Not every worker process started within %s seconds', MultiProcessLoadGenerator.start_timeout)
+        else:
+            if self.config.invariant_interval:
+                checker.start()
+
+        messages = []
+        for process, receiver in workers:
+            try:
+                messages.append(receiver.recv())
+            except EOFError:
+                messages.append({'error': 'exited without a result'})
+            process.join()
+            receiver.close()
+        stop.set()
+        if checker.is_alive():
+            checker.join()
+
+        self.worker_results = []
+        for index, message in enumerate(messages):
+            if 'error' in message:
+                result.add_violation(f"Worker process {index} failed: {message['error']}")
+                self.worker_results.append(None)
+                continue
+            worker_result = LoadResult.from_dict(message['result'])
+            self.worker_results.append(worker_result)
+            result.merge(worker_result)
+            for quote_id in message['deleted_ids']:
+                self.checker.state.mark_deleted(quote_id)
+        # Final check with every worker's DELETEs known, so reappearing deleted quotes are caught.
+        self.checker.check_invariants()
+        return result
+
+
+class _Counter:
+    """A thread-safe request counter"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0
+
+    def __next__(self):
+        with self._lock:
+            value = self._value
+            self._value += 1
+            return value
+
+
+def _print_report(passed_report):
+    print(f"{passed_report['requests']} requests in {passed_report['duration_s']:.1f}s "
+          f"({_format_number(passed_report['requests_per_second'], '.1f')} req/s)")
+    print(f"{'operation':<10} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'p99.9 ms':>9} {'max ms':>9}")
+    for operation, stats in passed_report['operations'].items():
+        numbers = [_format_number(stats['requests_per_second'], '.1f')]
+        numbers += [_format_number(stats['latency_ms'][name]) for name in ('p50', 'p95', 'p99', 'p999')]
+        numbers.append(_format_number(stats['max_ms']))
+        print(f"{operation:<10} {stats['requests']:>9} {stats['errors']:>7} "
+              + ' '.join(f'{number:>9}' for number in numbers))
+    print(f"Invariant checks: {passed_report['invariant_checks']}, violations: {passed_report['violation_count']}")
+    for violation in passed_report['violations']:
+        print(f'  {violation}')
+
+
+def _build_arg_parser():
+    parser = argparse.ArgumentParser(description='Run a mixed load or soak test against the quotes API.')
+    parser.add_argument('--base-url', default=SendRequest.base_url, help='Server to load')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Weighted operations, default: {DEFAULT_MIX}')
+    parser.add_argument('--duration', type=float, default=60.0, help='Seconds to run')
+    parser.add_argument('--rate', type=float, help='Fixed arrival rate in requests per second (open model)')
+    parser.add_argument('--concurrency', type=int, default=16, help='Worker threads, per process')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='Worker processes, each with its own connection pool; the rate is split between them')
+    parser.add_argument('--store-size', type=int, default=100, help='Quotes stored before the load starts')
+    parser.add_argument('--invariant-interval', type=float, default=1.0,
+                        help='Seconds between invariant checks (0 disables them during the run)')
+    parser.add_argument('--expected-interval-ms', type=float,
+                        help='Closed model only: expected time between requests per worker, for latency correction')
+    parser.add_argument('--no-reset', action='store_true', help='Keep the current store instead of POST /reset')
+    parser.add_argument('--seed', type=int, help='Seed for the operation mix')
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    return parser
+
+
+def _config_from_args(passed_args):
+    return LoadConfig(mix=parse_mix(passed_args.mix), duration=passed_args.duration, rate=passed_args.rate,
+                      concurrency=passed_args.concurrency, store_size=passed_args.store_size,
+                      invariant_interval=passed_args.invariant_interval,
+                      expected_interval=(passed_args.expected_interval_ms / 1000.0
+                                         if passed_args.expected_interval_ms else None),
+                      reset=not passed_args.no_reset, seed=passed_args.seed)
+
+
+def main(argv=None):
+    args = _build_arg_parser().parse_args(argv)
+    SendRequest.base_url = args.base_url
+    config = _config_from_args(args)
+    if args.processes > 1:
+        generator = MultiProcessLoadGenerator(config, args.processes)
+    else:
+        generator = LoadGenerator(config)
+    try:
+        result = generator.run()
+    finally:
+        generator.close()
+    report = result.report()
+    _print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'config': generator.config.as_dict(), 'processes': args.processes, 'report': report}, f,
+                      indent=4, sort_keys=True)
+    return 1 if report['violation_count'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
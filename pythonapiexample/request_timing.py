@@ -0,0 +1,348 @@
+"""
+Per-request timing instrumentation for SendRequest.
+
+A hook is any callable that accepts a RequestTiming; hooks are registered in SendRequest.hooks and called after
+every request. TimingRecorder is the standard hook: it keeps one mergeable LatencyHistogram per method and
+endpoint, plus request time per test when used through the pytest plugin in timing_plugin.py.
+
+Connect times are only measured for sessions whose adapters are TimingHTTPAdapter instances, such as the session
+owned by ConnectionManager; for other sessions they are reported as None.
+"""
+import json
+import math
+import threading
+import time
+from collections import Counter
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+_connect_timing = threading.local()
+
+
+def reset_connect_time():
+    """Clears the connect time measured on the calling thread"""
+    _connect_timing.seconds = None
+
+
+def get_connect_time():
+    """
+    Returns the seconds spent opening connections for the calling thread's last request: 0.0 if a pooled
+    connection was reused, or None if the request was not sent through a TimingHTTPAdapter.
+    """
+    return getattr(_connect_timing, 'seconds', None)
+
+
+def _record_connect(passed_connect):
+    start = time.perf_counter()
+    try:
+        passed_connect()
+    finally:
+        _connect_timing.seconds = (get_connect_time() or 0.0) + time.perf_counter() - start
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        _record_connect(super().connect)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        _record_connect(super().connect)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimingHTTPAdapter(HTTPAdapter):
+    """An HTTPAdapter whose connections record how long each new TCP (and TLS) connect takes."""
+
+    def send(self, *args, **kwargs):
+        # A request that reuses a pooled connection reports a connect time of zero rather than None.
+        _connect_timing.seconds = 0.0
+        return super().send(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool,
+        }
+
+
+class RequestTiming:
+    """Timing and size measurements for one request sent through SendRequest."""
+
+    def __init__(self, method, endpoint, status, total, time_to_first_byte=None, connect=None,
+                 request_bytes=0, response_bytes=None):
+        self.method = method
+        self.endpoint = endpoint
+        self.status = status
+        self.total = total
+        self.time_to_first_byte = time_to_first_byte
+        self.connect = connect
+        self.request_bytes = request_bytes
+        self.response_bytes = response_bytes
+
+    def __repr__(self):
+        return (f'RequestTiming({self.method} {self.endpoint} status={self.status} total={self.total:.6f}s '
+                f'ttfb={self.time_to_first_byte} connect={self.connect})')
+
+
+class LatencyHistogram:
+    """
+    A fixed-bucket, log-linear latency histogram in the style of HdrHistogram.
+
+    Values are recorded in microseconds into 1024 buckets with 32 sub-buckets per power of two, which keeps the
+    relative error of any reported percentile under about 3% from 1 microsecond up to several hours. Histograms
+    with the same layout can be merged by adding their bucket counts, and serialize to a compact sparse dict.
+    """
+
+    sub_bucket_bits = 5
+    bucket_count = 1024
+
+    def __init__(self):
+        self.counts = [0] * LatencyHistogram.bucket_count
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    @classmethod
+    def _index(cls, passed_microseconds):
+        value = max(int(passed_microseconds), 0)
+        shift = max(value.bit_length() - cls.sub_bucket_bits - 1, 0)
+        index = shift * (1 << cls.sub_bucket_bits) + (value >> shift)
+        return min(index, cls.bucket_count - 1)
+
+    @classmethod
+    def _upper_bound(cls, passed_index):
+        """Returns the largest value, in microseconds, that falls into the bucket at 'passed_index'"""
+        sub_bucket_count = 1 << cls.sub_bucket_bits
+        shift = max(passed_index // sub_bucket_count - 1, 0)
+        top = passed_index - shift * sub_bucket_count
+        return ((top + 1) << shift) - 1
+
+    def record(self, passed_seconds, passed_count=1):
+        """Records a latency given in seconds"""
+        self.counts[self._index(passed_seconds * 1e6)] += passed_count
+        self.count += passed_count
+        self.total += passed_seconds * passed_count
+        self.min = passed_seconds if self.min is None else min(self.min, passed_seconds)
+        self.max = passed_seconds if self.max is None else max(self.max, passed_seconds)
+
+    def record_corrected(self, passed_seconds, passed_expected_interval):
+        """
+        Records a latency and, like HdrHistogram's recordValueWithExpectedInterval, back-fills the samples a
+        closed-loop client failed to send while it was stalled: one for every 'passed_expected_interval' seconds
+        by which the latency exceeds that interval.
+        """
+        self.record(passed_seconds)
+        if not passed_expected_interval or passed_expected_interval <= 0:
+            return
+        missing = passed_seconds - passed_expected_interval
+        while missing >= passed_expected_interval:
+            self.record(missing)
+            missing -= passed_expected_interval
+
+    def merge(self, other):
+        """Adds the counts of another histogram to this one and returns self"""
+        for index, bucket_count in enumerate(other.counts):
+            if bucket_count:
+                self.counts[index] += bucket_count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def percentile(self, passed_percent):
+        """Returns the latency in seconds at or below which 'passed_percent' of the recorded values fall"""
+        if not self.count:
+            return None
+        # Nearest rank, the same as quotes_benchmark._percentile on the raw samples.
+        target = max(math.ceil(passed_percent / 100.0 * self.count), 1)
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return min(self._upper_bound(index) / 1e6, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'counts': {str(index): bucket_count for index, bucket_count in enumerate(self.counts) if bucket_count},
+            'count': self.count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, passed_dict):
+        histogram = cls()
+        for index, bucket_count in passed_dict['counts'].items():
+            histogram.counts[int(index)] = bucket_count
+        histogram.count = passed_dict['count']
+        histogram.total = passed_dict['total']
+        histogram.min = passed_dict['min']
+        histogram.max = passed_dict['max']
+        return histogram
+
+
+class EndpointStats:
+    """The aggregated timings of every request sent to one method and endpoint."""
+
+    def __init__(self):
+        self.total = LatencyHistogram()
+        self.time_to_first_byte = LatencyHistogram()
+        self.connect = LatencyHistogram()
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.statuses = Counter()
+
+    def add(self, passed_timing):
+        self.total.record(passed_timing.total)
+        if passed_timing.time_to_first_byte is not None:
+            self.time_to_first_byte.record(passed_timing.time_to_first_byte)
+        if passed_timing.connect:  # Only new connections; reused ones report 0.0 and unknown ones None.
+            self.connect.record(passed_timing.connect)
+        self.request_bytes += passed_timing.request_bytes or 0
+        self.response_bytes += passed_timing.response_bytes or 0
+        self.statuses[str(passed_timing.status)] += 1
+
+    def merge(self, other):
+        self.total.merge(other.total)
+        self.time_to_first_byte.merge(other.time_to_first_byte)
+        self.connect.merge(other.connect)
+        self.request_bytes += other.request_bytes
+        self.response_bytes += other.response_bytes
+        self.statuses.update(other.statuses)
+        return self
+
+    def to_dict(self):
+        return {
+            'total': self.total.to_dict(),
+            'time_to_first_byte': self.time_to_first_byte.to_dict(),
+            'connect': self.connect.to_dict(),
+            'request_bytes': self.request_bytes,
+            'response_bytes': self.response_bytes,
+            'statuses': dict(self.statuses),
+        }
+
+    @classmethod
+    def from_dict(cls, passed_dict):
+        stats = cls()
+        stats.total = LatencyHistogram.from_dict(passed_dict['total'])
+        stats.time_to_first_byte = LatencyHistogram.from_dict(passed_dict['time_to_first_byte'])
+        stats.connect = LatencyHistogram.from_dict(passed_dict['connect'])
+        stats.request_bytes = passed_dict['request_bytes']
+        stats.response_bytes = passed_dict['response_bytes']
+        stats.statuses = Counter(passed_dict['statuses'])
+        return stats
+
+
+class TimingRecorder:
+    """A SendRequest hook that aggregates request timings per method and endpoint, and per label (e.g. test)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints = {}
+        self.time_by_label = Counter()
+        self.label = None
+
+    def __call__(self, passed_timing):
+        key = f'{passed_timing.method} /{passed_timing.endpoint}'
+        with self._lock:
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = self.endpoints[key] = EndpointStats()
+            stats.add(passed_timing)
+            if self.label is not None:
+                self.time_by_label[self.label] += passed_timing.total
+
+    def merge(self, other):
+        with self._lock:
+            for key, stats in other.endpoints.items():
+                self.endpoints.setdefault(key, EndpointStats()).merge(stats)
+            self.time_by_label.update(other.time_by_label)
+        return self
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'endpoints': {key: stats.to_dict() for key, stats in self.endpoints.items()},
+                'time_by_label': dict(self.time_by_label),
+            }
+
+    @classmethod
+    def from_dict(cls, passed_dict):
+        recorder = cls()
+        recorder.endpoints = {key: EndpointStats.from_dict(stats) for key, stats in passed_dict['endpoints'].items()}
+        recorder.time_by_label = Counter(passed_dict['time_by_label'])
+        return recorder
+
+    def summary(self):
+        """Returns one row of latency percentiles (in milliseconds) and sizes per endpoint, slowest first"""
+        rows = []
+        with self._lock:
+            for key, stats in self.endpoints.items():
+                rows.append({
+                    'endpoint': key,
+                    'requests': stats.total.count,
+                    'total_s': stats.total.total,
+                    'p50_ms': _to_ms(stats.total.percentile(50)),
+                    'p95_ms': _to_ms(stats.total.percentile(95)),
+                    'p99_ms': _to_ms(stats.total.percentile(99)),
+                    'max_ms': _to_ms(stats.total.max),
+                    'ttfb_p50_ms': _to_ms(stats.time_to_first_byte.percentile(50)),
+                    'connect_p50_ms': _to_ms(stats.connect.percentile(50)),
+                    'connects': stats.connect.count,
+                    'request_bytes': stats.request_bytes,
+                    'response_bytes': stats.response_bytes,
+                    'statuses': dict(stats.statuses),
+                })
+        rows.sort(key=lambda row: row['total_s'], reverse=True)
+        return rows
+
+    def format_summary(self, passed_top_labels=5):
+        """Returns the summary as a printable table followed by the labels with the most request time"""
+        lines = [f"{'endpoint':<24} {'requests':>9} {'total s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+                 f"{'max ms':>8} {'ttfb ms':>8} {'connects':>8}"]
+        for row in self.summary():
+            lines.append(f"{row['endpoint']:<24} {row['requests']:>9} {row['total_s']:>9.3f} "
+                         + ' '.join(f'{_format_number(row[name]):>8}'
+                                    for name in ('p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'ttfb_p50_ms'))
+                         + f" {row['connects']:>8}")
+        if self.time_by_label:
+            lines.append('')
+            lines.append('Most request time:')
+            for label, seconds in self.time_by_label.most_common(passed_top_labels):
+                lines.append(f'  {seconds:9.3f}s  {label}')
+        return '\n'.join(lines)
+
+    def write(self, passed_path):
+        """Writes the summary and the mergeable histograms as JSON"""
+        with open(passed_path, 'w', encoding='utf-8') as f:
+            json.dump({'summary': self.summary(), 'recorder': self.to_dict()}, f, indent=4, sort_keys=True)
+
+
+def _to_ms(passed_seconds):
+    return None if passed_seconds is None else passed_seconds * 1000.0
+
+
+def _format_number(passed_value, passed_spec='.2f'):
+    """Formats a number with 'passed_spec', or returns '-' when there is none, e.g. no completed requests"""
+    return '-' if passed_value is None else format(passed_value, passed_spec)
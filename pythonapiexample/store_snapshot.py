@@ -0,0 +1,199 @@
+"""
+Memory-compact snapshots of the quotes store for verifying large stores.
+
+A StoreSnapshot keeps the ids from GET /quotes in an array('q') and a 64-bit hash of each text in an array('Q'),
+about 16 bytes per quote instead of a dict and two Python objects per entry. The texts themselves are only kept,
+in one shared UTF-8 buffer, when asked for. Sortedness, uniqueness and diff checks run vectorized on NumPy views
+of the arrays when NumPy is installed (pip3 install -e .[snapshot]) and as linear scans otherwise.
+"""
+from array import array
+from bisect import bisect_left
+from hashlib import blake2b
+
+try:
+    import numpy
+except ImportError:  # Optional dependency, see the 'snapshot' extra in setup.py.
+    numpy = None
+
+
+def text_hash(passed_text):
+    """Returns a 64-bit hash of a quote text that is stable across processes, unlike hash()"""
+    return int.from_bytes(blake2b(passed_text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class StoreSnapshot:
+    """The ids and text hashes of every quote returned by one GET /quotes, in server order."""
+
+    def __init__(self, keep_texts=False):
+        self.ids = array('q')
+        self.hashes = array('Q')
+        self._text_buffer = bytearray() if keep_texts else None
+        self._text_offsets = array('Q', [0]) if keep_texts else None
+        self._sorted = None
+
+    @classmethod
+    def from_pairs(cls, passed_pairs, keep_texts=False):
+        """Builds a snapshot from (id, text) pairs, e.g. from _iter_quotes_from_server, in a single pass"""
+        snapshot = cls(keep_texts=keep_texts)
+        for quote_id, text in passed_pairs:
+            snapshot.append(quote_id, text)
+        return snapshot
+
+    @classmethod
+    def from_response_data(cls, passed_response_data, keep_texts=False):
+        """Builds a snapshot from the decoded 'data' list of a GET /quotes response"""
+        return cls.from_pairs(((elem['id'], elem['text']) for elem in passed_response_data), keep_texts=keep_texts)
+
+    def append(self, passed_id, passed_text):
+        self.ids.append(passed_id)
+        self.hashes.append(text_hash(passed_text))
+        if self._text_buffer is not None:
+            self._text_buffer += passed_text.encode('utf-8')
+            self._text_offsets.append(len(self._text_buffer))
+        self._sorted = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __contains__(self, passed_id):
+        return self._position(passed_id) is not None
+
+    def _numpy_ids(self):
+        return numpy.frombuffer(self.ids, dtype=numpy.int64)
+
+    def _position(self, passed_id):
+        """Returns the position of 'passed_id', by binary search when the ids are sorted, or None"""
+        if self.is_sorted():
+            position = bisect_left(self.ids, passed_id)
+            return position if position < len(self.ids) and self.ids[position] == passed_id else None
+        try:
+            return self.ids.index(passed_id)
+        except ValueError:
+            return None
+
+    def get_text(self, passed_id):
+        """Returns the text of 'passed_id', or None if it is not present; requires keep_texts=True"""
+        if self._text_buffer is None:
+            raise ValueError('This snapshot was built without keep_texts=True and only holds text hashes.')
+        position = self._position(passed_id)
+        if position is None:
+            return None
+        start, end = self._text_offsets[position], self._text_offsets[position + 1]
+        return self._text_buffer[start:end].decode('utf-8')
+
+    def unsorted_position(self):
+        """Returns the first position whose id is greater than the next one, or None if the ids are sorted"""
+        if numpy is not None:
+            positions = numpy.flatnonzero(numpy.diff(self._numpy_ids()) < 0)
+            return int(positions[0]) if positions.size else None
+        ids = self.ids
+        for position in range(len(ids) - 1):
+            if ids[position] > ids[position + 1]:
+                return position
+        return None
+
+    def is_sorted(self):
+        if self._sorted is None:
+            self._sorted = self.unsorted_position() is None
+        return self._sorted
+
+    @property
+    def duplicate_count(self):
+        """The number of ids that appear more than once"""
+        if numpy is not None:
+            return len(self.ids) - int(numpy.unique(self._numpy_ids()).size)
+        if self.is_sorted():
+            ids = self.ids
+            return sum(1 for position in range(1, len(ids)) if ids[position] == ids[position - 1])
+        return len(self.ids) - len(set(self.ids))
+
+    def diff(self, other):
+        """
+        Returns a SnapshotDiff from this snapshot to 'other': ids only in 'other' were added, ids only in this one
+        were removed, and ids in both whose text hash differs were changed. The work is linear in the size of both.
+        """
+        if numpy is not None:
+            return self._numpy_diff(other)
+        if self.is_sorted() and other.is_sorted():
+            return self._merge_diff(other)
+        # Hash index of this snapshot, then one pass over 'other'.
+        positions = {}
+        for position, quote_id in enumerate(self.ids):
+            positions.setdefault(quote_id, position)
+        result = SnapshotDiff()
+        seen = set()
+        for other_position, quote_id in enumerate(other.ids):
+            if quote_id in seen:
+                continue
+            seen.add(quote_id)
+            position = positions.pop(quote_id, None)
+            if position is None:
+                result.added.append(quote_id)
+            elif self.hashes[position] != other.hashes[other_position]:
+                result.changed.append(quote_id)
+        result.removed.extend(positions)
+        return result.sort()
+
+    def _merge_diff(self, other):
+        """SnapshotDiff for two snapshots with sorted ids, in one merge walk without an index"""
+        result = SnapshotDiff()
+        ids, other_ids = self.ids, other.ids
+        position = other_position = 0
+        while position < len(ids) or other_position < len(other_ids):
+            quote_id = ids[position] if position < len(ids) else None
+            other_id = other_ids[other_position] if other_position < len(other_ids) else None
+            if other_id is None or (quote_id is not None and quote_id < other_id):
+                result.removed.append(quote_id)
+                position = _next_id_position(ids, position)
+            elif quote_id is None or quote_id > other_id:
+                result.added.append(other_id)
+                other_position = _next_id_position(other_ids, other_position)
+            else:
+                if self.hashes[position] != other.hashes[other_position]:
+                    result.changed.append(quote_id)
+                position = _next_id_position(ids, position)
+                other_position = _next_id_position(other_ids, other_position)
+        return result
+
+    def _numpy_diff(self, other):
+        ids, other_ids = self._numpy_ids(), other._numpy_ids()
+        hashes = numpy.frombuffer(self.hashes, dtype=numpy.uint64)
+        other_hashes = numpy.frombuffer(other.hashes, dtype=numpy.uint64)
+        common, positions, other_positions = numpy.intersect1d(ids, other_ids, return_indices=True)
+        result = SnapshotDiff()
+        result.added.frombytes(numpy.setdiff1d(other_ids, ids).tobytes())
+        result.removed.frombytes(numpy.setdiff1d(ids, other_ids).tobytes())
+        result.changed.frombytes(common[hashes[positions] != other_hashes[other_positions]].tobytes())
+        return result
+
+
+def _next_id_position(passed_ids, passed_position):
+    """Returns the position after 'passed_position' in sorted ids, skipping repeats of the same id"""
+    quote_id = passed_ids[passed_position]
+    passed_position += 1
+    while passed_position < len(passed_ids) and passed_ids[passed_position] == quote_id:
+        passed_position += 1
+    return passed_position
+
+
+class SnapshotDiff:
+    """The sorted ids added, removed and changed between two StoreSnapshots."""
+
+    def __init__(self):
+        self.added = array('q')
+        self.removed = array('q')
+        self.changed = array('q')
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self):
+        return f'<SnapshotDiff added={len(self.added)} removed={len(self.removed)} changed={len(self.changed)}>'
+
+    def sort(self):
+        for name in ('added', 'removed', 'changed'):
+            setattr(self, name, array('q', sorted(getattr(self, name))))
+        return self
@@ -0,0 +1,32 @@
+import pytest
+
+from pythonapiexample.capacity_probe import CapacityProbe
+from pythonapiexample.local_quotes_server import BUGGY_MAX_QUOTES
+
+
+def _run_probe(**passed_kwargs):
+    probe = CapacityProbe(**passed_kwargs)
+    try:
+        return probe.run()
+    finally:
+        probe.close()
+
+
+class TestCapacityProbe:
+    @pytest.mark.parametrize('local_server', [True], indirect=True)
+    def test_finds_the_limit_of_the_buggy_server(self, local_server):
+        """The buggy server stores at most BUGGY_MAX_QUOTES quotes, and the probe reports exactly that."""
+        report = _run_probe(concurrency=4, max_size=1000, batch_size=8)
+
+        assert report['base_url'] == local_server.url
+        assert report['largest_ok'] == BUGGY_MAX_QUOTES == 18
+        assert report['first_failure'] == BUGGY_MAX_QUOTES + 1
+        assert any(not probe['ok'] for probe in report['probes'])
+
+    def test_stops_at_max_size(self, local_server):
+        report = _run_probe(concurrency=4, max_size=50, batch_size=16)
+
+        assert report['largest_ok'] == 50
+        assert report['first_failure'] is None
+        assert all(probe['ok'] for probe in report['probes'])
+        assert report['probes'][-1]['size'] == 50
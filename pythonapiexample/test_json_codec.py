@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from pythonapiexample import json_codec
+
+
+@pytest.fixture(params=json_codec.available_codecs())
+def codec_name(request):
+    """Selects each installed backend in turn and restores the previous codec afterwards"""
+    previous = json_codec.set_codec(request.param)
+    yield request.param
+    json_codec.set_codec(previous)
+
+
+class TestJsonCodec:
+    def test_dumps_returns_bytes(self, codec_name):
+        encoded = json_codec.dumps({'text': 'Float like a butterfly, é \U0001f600 "quoted"'})
+
+        assert isinstance(encoded, bytes)
+        assert json.loads(encoded) == {'text': 'Float like a butterfly, é \U0001f600 "quoted"'}
+        assert json.loads(json_codec.dumps_pretty({'b': 1, 'a': [1, 2]})) == {'a': [1, 2], 'b': 1}
+
+    def test_loads_round_trip(self, codec_name):
+        value = {'ok': True, 'data': [{'id': 1, 'text': 'We have nothing to fear'}], 'error': None}
+
+        assert json_codec.loads(json_codec.dumps(value)) == value
+        assert json_codec.loads(json_codec.dumps(value).decode('utf-8')) == value
+
+    @pytest.mark.parametrize('invalid', [b'{"text": }', b'', b'{"text": "unterminated', '[1, 2', b'\xff\xfe{}'])
+    def test_loads_raises_json_decode_error(self, codec_name, invalid):
+        """Invalid and non-UTF-8 input raises json.JSONDecodeError whatever the backend."""
+        with pytest.raises(json.JSONDecodeError):
+            json_codec.loads(invalid)
+
+    def test_set_codec_returns_previous(self, codec_name):
+        previous = json_codec.set_codec('json')
+        try:
+            assert previous.name == codec_name
+            assert json_codec.get_codec().name == 'json'
+        finally:
+            assert json_codec.set_codec(previous).name == 'json'
+        assert json_codec.get_codec() is previous
+
+
+class TestCreateCodec:
+    def test_unknown_name(self):
+        with pytest.raises(ValueError, match='Unknown JSON codec'):
+            json_codec._create_codec('simplejson')
+
+    def test_uninstalled_name(self, monkeypatch):
+        monkeypatch.setitem(json_codec._CODECS, 'orjson', None)
+
+        assert 'orjson' not in json_codec.available_codecs()
+        with pytest.raises(ValueError, match='not installed'):
+            json_codec._create_codec('orjson')
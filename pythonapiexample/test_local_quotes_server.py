@@ -0,0 +1,22 @@
+import requests
+
+
+class TestConditionalGet:
+    def test_if_none_match_applies_to_the_full_list_only(self, local_server):
+        """The store's ETag revalidates GET /quotes, but a page is a different representation and is always sent."""
+        url = f'{local_server.url}/quotes'
+        with requests.Session() as session:
+            etag = session.get(url).headers['ETag']
+
+            full_response = session.get(url, headers={'If-None-Match': etag})
+            page_response = session.get(url, params={'limit': 2}, headers={'If-None-Match': etag})
+            session.post(url, json={'text': 'A new quote'})
+            changed_response = session.get(url, headers={'If-None-Match': etag})
+
+        assert full_response.status_code == 304
+        assert full_response.content == b''
+        assert page_response.status_code == 200
+        assert page_response.headers['ETag'] == etag
+        assert len(page_response.json()['data']) == 2
+        assert changed_response.status_code == 200
+        assert changed_response.headers['ETag'] != etag
@@ -0,0 +1,57 @@
+import pytest
+
+from pythonapiexample import json_codec
+from pythonapiexample.quote_data import (PAYLOAD_STYLES, QuoteDataCache, QuoteGenerator, cached_sentences,
+                                         encode_quote_payload)
+
+
+class TestQuoteGenerator:
+    def test_same_seed_same_data(self):
+        first, second = QuoteGenerator(seed=7), QuoteGenerator(seed=7)
+
+        assert first.sentences(50) == second.sentences(50)
+        assert first.sentence() == second.sentence()
+        assert first.paragraphs(3) == second.paragraphs(3)
+        assert first.sized_texts(5, 200, style='unicode') == second.sized_texts(5, 200, style='unicode')
+
+    def test_different_seeds_differ(self):
+        assert QuoteGenerator(seed=1).sentences(20) != QuoteGenerator(seed=2).sentences(20)
+
+    def test_quotes_are_unique_across_batches(self):
+        """Quotes stay unique across batches of one generator."""
+        generator = QuoteGenerator(seed=3)
+        quotes = generator.sentences(5000) + [generator.sentence() for _ in range(100)] + generator.sentences(10)
+
+        assert len(set(quotes)) == len(quotes)
+
+    @pytest.mark.parametrize('codec_name', json_codec.available_codecs())
+    @pytest.mark.parametrize('style', PAYLOAD_STYLES)
+    def test_sized_texts_are_byte_exact(self, style, codec_name):
+        """Every POST /quotes body is exactly the requested size with each style and codec."""
+        previous = json_codec.set_codec(codec_name)
+        try:
+            generator = QuoteGenerator(seed=11)
+            for size in (20, 33, 100, 1000, 4096):
+                texts = generator.sized_texts(20, size, style=style)
+
+                assert len(set(texts)) == len(texts)
+                assert [len(encode_quote_payload(text)) for text in texts] == [size] * len(texts)
+        finally:
+            json_codec.set_codec(previous)
+
+    def test_sized_text_errors(self):
+        with pytest.raises(ValueError, match='Unknown payload style'):
+            QuoteGenerator().sized_text(100, style='binary')
+        with pytest.raises(ValueError, match='at least'):
+            QuoteGenerator().sized_text(5)
+
+
+class TestQuoteDataCache:
+    def test_cached_sentences_match_generator(self, tmp_path):
+        cache = QuoteDataCache(str(tmp_path))
+        built = cached_sentences(100, seed=5, cache=cache)
+        reread = cache.get('sentences-5-100', lambda: pytest.fail('The cached file was not reused'))
+
+        assert built == QuoteGenerator(5).sentences(100)
+        assert reread == built
+        assert len(list(tmp_path.iterdir())) == 1
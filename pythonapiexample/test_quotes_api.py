@@ -1,217 +1,145 @@
-import json
+import importlib.util
 import logging
-from json import JSONDecodeError
+import os
+import zlib
 
-import jsonpath
 import pytest
-import requests
-# See https://loremipsum.readthedocs.io/en/latest/
-from loremipsum import get_sentence, get_paragraphs
+
+try:
+    import pytest_asyncio
+except ImportError:  # Optional dependency, see the 'async' extra in setup.py; the async tests are skipped without it.
+    pytest_asyncio = None
+
+from pythonapiexample.local_quotes_server import LocalQuotesServer
+from pythonapiexample.quote_data import QuoteGenerator, cached_paragraphs
+from pythonapiexample.quotes_client import (ConnectionManager, QuoteIndex, QuotePages, ResponseError, SeededStates,
+                                            SendRequest, SendReset, _Abbreviated,
+                                            _get_first_value_for_key_from_response_data, _get_ids_from_server,
+                                            _get_index_from_server, _get_key_value_from_response,
+                                            _get_snapshot_from_server, _get_status_code, _iter_quotes_from_server,
+                                            assert_status)
+from pythonapiexample.store_snapshot import StoreSnapshot
+from pythonapiexample.traffic_replay import ReplayAdapter, TrafficRecorder
 
 logger = logging.getLogger(__name__)
 
 
-# Helper methods
-def _check_if_int(passed_value):
-    """Checks if the passed value is an integer"""
-    if not isinstance(passed_value, int):
-        raise ResponseError(f'Invalid value: \'{passed_value}\' is not an int.')
-
-
-def _get_status_code(passed_response):
-    """Returns the status code of the passed response"""
-    passed_response_status_code = passed_response.status_code
-    _check_if_int(passed_response_status_code)
-    if passed_response:
-        logger.info('Operation success!')
-    else:
-        # info level used for reporting status code errors
-        logger.info(f"An error has occurred: {passed_response}")
-    return passed_response_status_code
-
-
-def _get_key_value_from_response(passed_response, passed_key):
-    """Returns the first value of 'passed_key' in the passed response"""
-    try:
-        json_response = json.loads(passed_response.text)
-        value = jsonpath.jsonpath(json_response, passed_key)
-        logger.debug(f'{passed_key}: {value[0]}')
-        return value[0]
-    except JSONDecodeError:
-        logger.fatal(f'Invalid response body returned from server. Expecting JSON. Found:\n{passed_response.text}')
-    except TypeError:
-        logger.fatal(f'Passed key \'{passed_key}\' was not found in response:\n{passed_response.text}')
-
-
-def _get_first_value_for_key_from_response_data(passed_response, passed_key):
-    """Returns the first value for 'passed_key' in the passed response"""
-    value = jsonpath.jsonpath(passed_response, passed_key)
-    logger.debug(f'value: {value[0]}')
-    return value[0]
-
-
-def _get_all_values_for_key_from_response_data(passed_response, passed_key):
-    """Returns a list of all values for 'passed_key' in the passed response"""
-    ids = []
-    try:
-        for elem in passed_response:
-            logger.debug(f'elem[{passed_key}]: {elem[passed_key]}')
-            ids.append(elem[passed_key])
-        return ids
-    except KeyError:
-        logger.fatal(f'Key \'{passed_key}\' was not found in the response data:\n{passed_response}')
-
-
-def _get_ids_from_server(session, send_request):
-    response = send_request.get(session)
-    response_data = _get_key_value_from_response(response, 'data')
-    logger.debug(f'initial_get_response_data: {response_data}')
-    ids = _get_all_values_for_key_from_response_data(response_data, 'id')
-    return ids
-
-
-def _get_entry_from_response_data(passed_response, passed_key, target_value):
-    try:
-        for elem in passed_response:
-            if elem[passed_key] == target_value:
-                logger.debug(f'elem[{passed_key}]: {elem[passed_key]} == {target_value}')
-                return elem
-        logger.fatal(
-            f'Entry for {passed_key} with value {target_value} was not found in the response data:\n{passed_response}')
-    except KeyError:
-        logger.fatal(f'Key \'{passed_key}\' was not found in the response data:\n{passed_response}')
-
-
-def assert_status(passed_response, expected_status):
-    assert passed_response.status_code == expected_status, "Expected: {} actual: {}. Response error: {}".format(
-        expected_status, passed_response.status_code, _get_key_value_from_response(passed_response, 'error'))
-
-
-class ResponseError(Exception):
-    """An exception class for the REST API Response"""
-
-
-class SendReset:
-    """Reset the API and make session and send_request available."""
-
-    def __init__(self):
-        session = requests.Session()
-        send_request = SendRequest()
-        response = send_request.reset(session)
-        response_status_code = _get_status_code(response)
-        response_ok = _get_key_value_from_response(response, 'ok')
-        assert response_status_code == 200
-        assert response_ok is True
-        self.session = session
-        self.send_request = send_request
-
-
-class SendRequest:
-    """Send API requests to 'quotes_server .py' generated url endpoints."""
-
-    base_url = "http://127.0.0.1:6543"
-    quotes_endpoint = "quotes"
-    reset_endpoint = "reset"
-    headers = {
-        'Content-Type': 'application/json',
-        'Accept': '*/*'
-    }
-    empty_data = {}
-
-    def reset(self, passed_session):
-        # Send POST Request
-        logger.info(f"POST url: {SendRequest.base_url}/{SendRequest.reset_endpoint}")
-        response = passed_session.post(f'{SendRequest.base_url}/{SendRequest.reset_endpoint}',
-                                       headers=SendRequest.headers, data=json.dumps(SendRequest.empty_data))
-        return response
-
-    def get(self, passed_session):
-        # Send GET Request
-        logger.info(f"GET url: {SendRequest.base_url}/{SendRequest.quotes_endpoint}   ")
-        response = passed_session.get(f"{SendRequest.base_url}/{SendRequest.quotes_endpoint}")
-        return response
-
-    def get_id(self, passed_session, passed_id):
-        # Send GET Request
-        logger.info(f"GET url: {SendRequest.base_url}/{SendRequest.quotes_endpoint}/{passed_id}")
-        _check_if_int(passed_id)
-        response = passed_session.get(f"{SendRequest.base_url}/{SendRequest.quotes_endpoint}/{passed_id}")
-        return response
-
-    def delete(self, passed_session, passed_id=''):
-        # Send DELETE Request
-        logger.info(f"DELETE url: {SendRequest.base_url}/{SendRequest.quotes_endpoint}/{passed_id}")
-        response = passed_session.delete(f"{SendRequest.base_url}/{SendRequest.quotes_endpoint}/{passed_id}")
-        return response
-
-    def post(self, passed_session, passed_json_string=''):
-        # Send POST Request
-        logger.info(f"POST url: {SendRequest.base_url}/{SendRequest.quotes_endpoint} with data {passed_json_string}")
-        try:
-            if passed_json_string == '':  # To allow for sending am empty JSON payload to the endpoint.
-                request_json = SendRequest.empty_data.copy()
-            else:
-                request_json = json.loads(passed_json_string)
-        except JSONDecodeError:  # This is an ugly solution to allow passing of invalid JSON payload to the endpoint.
-            request_json = passed_json_string
-        except ValueError:
-            raise ResponseError(f'Invalid value: \'{passed_json_string}\' is not a valid json.')
-        response = passed_session.post(f"{SendRequest.base_url}/{SendRequest.quotes_endpoint}",
-                                       headers=SendRequest.headers, data=json.dumps(request_json))
-        return response
-
-    def custom_method_endpoint(self, passed_session, passed_endpoint, passed_method):
-        print(f'passed_method: {passed_method}')
-
-        url = SendRequest.base_url + '/' + passed_endpoint
-        print(f'url: {url}')
-        response = None
-        if passed_method == 'GET':
-            logger.info(f"GET url: {url}")
-            response = passed_session.get(url)
-        elif passed_method == 'POST':
-            logger.info(f"POST url: {url}")
-            response = passed_session.post(url)
-        elif passed_method == 'PUT':
-            logger.info(f"PUT url: {url}")
-            response = passed_session.put(url)
-        elif passed_method == 'DELETE':
-            logger.info(f"DELETE url: {url}")
-            response = passed_session.put(url)
-        elif passed_method == 'PATCH':
-            logger.info(f"PATCH url: {url}")
-            response = passed_session.patch(url)
-        elif passed_method == 'HEAD':
-            logger.info(f"HEAD url: {url}")
-            response = passed_session.head(url)
-        elif passed_method == 'OPTIONS':
-            logger.info(f"OPTIONS url: {url}")
-            response = passed_session.options(url)
-        else:
-            logger.error(f'Unknown/Unsupported method: \'{passed_method}\'.')
-        return response
-
-
-if __name__ == "__main__":
-    print("Pytest Skills Evaluation against " + SendRequest.base_url)
-    cur_session = requests.Session()
-    request = SendRequest()
-    operations = [
-        request.reset,
-        request.get,
-        request.get_id,
-        request.delete,
-        request.post,
-        request.custom_method_endpoint
-    ]
-    print('Available operations: ')
-    for i, operation in enumerate(operations, start=1):
-        print(f"{i}: {operation.__name__}")
-    try:
-        print('\nGET: ')
-        print(json.dumps(_get_key_value_from_response(operations[1](cur_session), 'data'), indent=4, sort_keys=True))
-    except ResponseError as ex:
-        print(ex)
+def _reconcile_created_ids(session, send_request, initial_ids, created_ids):
+    """
+    Checks a single GET /quotes against the initial ids plus the ids created since, and returns its QuoteIndex.
+    """
+    quote_index = _get_index_from_server(session, send_request)
+    missing_ids = created_ids - quote_index.id_set
+    assert not missing_ids, f'Created ids missing from GET /quotes: {sorted(missing_ids)}'
+    assert len(quote_index) == len(initial_ids) + len(created_ids)
+    return quote_index
+
+
+def _get_worker_number():
+    """Returns the pytest-xdist worker number of this process (0 when not running in parallel)"""
+    worker_id = os.environ.get('PYTEST_XDIST_WORKER', 'gw0')
+    return int(worker_id[2:]) if worker_id.startswith('gw') else 0
+
+
+def _get_external_base_url():
+    """
+    Returns the external server for this process. QUOTES_SERVER_URLS may list one comma separated server per
+    pytest-xdist worker; otherwise every worker shares SendRequest.base_url, which is only safe without workers.
+    """
+    urls = [url.strip() for url in os.environ.get('QUOTES_SERVER_URLS', '').split(',') if url.strip()]
+    worker_count = int(os.environ.get('PYTEST_XDIST_WORKER_COUNT', '1'))
+    if not urls:
+        urls = [SendRequest.base_url]
+    if len(urls) < worker_count:
+        pytest.fail(f'{worker_count} workers share {len(urls)} external quotes server(s); every test resets the '
+                    f'whole store, so list one server per worker in QUOTES_SERVER_URLS.', pytrace=False)
+    return urls[_get_worker_number()]
+
+
+@pytest.fixture(scope='session')
+def quotes_server():
+    """
+    Point SendRequest at the server under test for the whole session.
+    By default a bundled LocalQuotesServer is started on an ephemeral port. Under pytest-xdist every worker process
+    starts its own, so each worker has an isolated quote store. Set QUOTES_SERVER=external to test the server already
+    running at SendRequest.base_url (or the per-worker servers in QUOTES_SERVER_URLS) instead, or
+    QUOTES_SERVER_BUGS=1 to have the local server reproduce the bugs in bugs_found.txt. With QUOTES_REPLAY set no
+    server is used at all; responses come from the recording, see connection_manager.
+    """
+    original_base_url = SendRequest.base_url
+    if os.environ.get('QUOTES_REPLAY'):
+        yield SendRequest.base_url
+        return
+    if os.environ.get('QUOTES_SERVER', 'local') == 'external':
+        SendRequest.base_url = _get_external_base_url()
+        yield SendRequest.base_url
+        SendRequest.base_url = original_base_url
+        return
+    server = LocalQuotesServer(reproduce_bugs=os.environ.get('QUOTES_SERVER_BUGS') == '1').start()
+    SendRequest.base_url = server.url
+    yield server.url
+    SendRequest.base_url = original_base_url
+    server.stop()
+
+
+@pytest.fixture
+def quote_data(request):
+    """
+    A QuoteGenerator seeded from the test's node id, so every test gets the same quotes on every run whatever the
+    test order or worker. Set QUOTES_DATA_SEED to draw a different, equally reproducible data set.
+    """
+    base_seed = int(os.environ.get('QUOTES_DATA_SEED', '0'))
+    return QuoteGenerator(seed=base_seed ^ zlib.crc32(request.node.nodeid.encode('utf-8')))
+
+
+def _get_recording_path(passed_path):
+    """Returns the recording file for this process; pytest-xdist workers each record to their own file"""
+    worker_id = os.environ.get('PYTEST_XDIST_WORKER')
+    return f'{passed_path}.{worker_id}' if worker_id else passed_path
+
+
+@pytest.fixture(scope='session')
+def connection_manager(quotes_server):
+    """
+    A single pooled connection manager shared by every test in the session.
+    QUOTES_REPLAY=<file> answers every request from a QUOTES_RECORD recording (see traffic_recorder) instead of a
+    server, so the assertions run offline. QUOTES_HTTP_CACHE=1 turns on the ETag cache of GET /quotes for every
+    SendRequest, and QUOTES_PAGE_SIZE=<n> reads the full store in parallel pages.
+    """
+    manager = ConnectionManager()
+    SendRequest.page_size = int(os.environ.get('QUOTES_PAGE_SIZE') or 0) or None
+    SendRequest.use_cache = os.environ.get('QUOTES_HTTP_CACHE') == '1'
+    replay_path = os.environ.get('QUOTES_REPLAY')
+    if replay_path:
+        adapter = ReplayAdapter.from_file(replay_path)
+        manager.session.mount('http://', adapter)
+        manager.session.mount('https://', adapter)
+    yield manager
+    SendRequest.use_cache = False
+    SendRequest.page_size = None
+    manager.close()
+
+
+@pytest.fixture(scope='module', autouse=True)
+def traffic_recorder():
+    """
+    QUOTES_RECORD=<file> appends the SendRequest traffic of this module's tests to a recording. The recorder stops
+    at module teardown, so traffic from later test modules does not end up in the recording
+    """
+    recording_path = os.environ.get('QUOTES_RECORD')
+    if not recording_path:
+        yield None
+        return
+    SendRequest.recorder = TrafficRecorder(_get_recording_path(recording_path))
+    yield SendRequest.recorder
+    SendRequest.recorder.close()
+    SendRequest.recorder = None
+
+
+@pytest.fixture(scope='session')
+def seeded_states(connection_manager):
+    """Seeded store states built once per session (or per xdist worker) and restored from server snapshots"""
+    return SeededStates(connection_manager.session)
 
 
 class TestCases:
@@ -233,10 +161,10 @@ class TestCases:
     #     global_server_process.terminate()
 
     @pytest.fixture
-    def setup(self):
+    def setup(self, connection_manager):
         """Reset the API state before each test case to maintain test case independence"""
-        logger.debug("setup           class:%s" % self)
-        return SendReset()
+        logger.debug("setup           class:%s", self)
+        return SendReset(connection_manager.session)
 
     # def setup_method(self):
     #     """Reset the API state before each test case to maintain test case independence"""
@@ -279,27 +207,48 @@ class TestCases:
         assert response_ok is True
         assert len(response_data) == 3
 
-    def test_get_requirements(self, setup):
+    def test_get_cached(self, setup):
+        """Not required; GET /quotes is served from the ETag cache until a POST changes the store."""
+        send_request = SendRequest(use_cache=True)
+        first_response = send_request.get(setup.session)
+        first_data = _get_key_value_from_response(first_response, 'data')
+        second_response = send_request.get(setup.session)
+
+        assert second_response is first_response
+        assert send_request.cache.hits == 1
+        assert _get_key_value_from_response(second_response, 'data') == first_data
+
+        # A POST through the same client clears the cache, so the next GET sees the new quote.
+        post_response = send_request.post_quote(setup.session, "I have a dream")
+        new_id = _get_key_value_from_response(post_response, 'data')['id']
+        assert len(send_request.cache) == 0
+        third_response = send_request.get(setup.session)
+        third_data = _get_key_value_from_response(third_response, 'data')
+
+        assert _get_status_code(third_response) == 200
+        assert send_request.cache.hits == 1
+        assert [elem['id'] for elem in third_data] == [elem['id'] for elem in first_data] + [new_id]
+
+    @pytest.mark.parametrize('seeding', ['post', 'snapshot'])
+    def test_get_requirements(self, setup, seeded_states, quote_data, seeding):
         """
         Test default GET /quotes output.
         Requirement: Output data is sorted by id. Test that this is true for at least 12 quotes.
         Requirement: There are no duplicate IDs.
+        The 'post' case stores the quotes with POST /quotes in this test; the 'snapshot' case restores the same
+        number of quotes from a seeded_states snapshot.
         """
         num_total_entries = 15
 
-        # Get the initial id entries from the server
-        initial_ids = _get_ids_from_server(setup.session, setup.send_request)
-
-        # Loop to create the number of new entries
-        for x in range(num_total_entries - len(initial_ids)):
-            logger.debug(f'x: {x}')
-            quote_text = get_sentence(True)
-            post_response = setup.send_request.post(setup.session, '{"text": "' + quote_text + '"}')
-            assert_status(post_response, 201)
-            post_response_status_code = _get_status_code(post_response)
-            post_response_ok = _get_key_value_from_response(post_response, 'ok')
-            assert post_response_status_code == 201
-            assert post_response_ok is True
+        if seeding == 'post':
+            # Create the new entries concurrently
+            initial_ids = _get_ids_from_server(setup.session, setup.send_request)
+            post_result = setup.send_request.post_many(setup.session,
+                                                       quote_data.sentences(num_total_entries - len(initial_ids)))
+            assert not post_result.failures, f'Failed POST /quotes requests: {post_result.failures}'
+        else:
+            # Restore the seeded store; it is built with concurrent POSTs only the first time
+            seeded_states.restore(num_total_entries, seed=int(os.environ.get('QUOTES_DATA_SEED', '0')))
 
         # Get the GET payload from the server.
         response = setup.send_request.get(setup.session)
@@ -307,18 +256,64 @@ class TestCases:
         response_ok = _get_key_value_from_response(response, 'ok')
         response_data = _get_key_value_from_response(response, 'data')
 
-        # Get the id keys from the payload.
-        keys_from_server = _get_all_values_for_key_from_response_data(response_data, 'id')
-
-        # Sort the keys numerically in a second array.
-        sorted_keys_from_server = keys_from_server.copy()
-        sorted_keys_from_server.sort()
+        # Snapshot the ids and text hashes from the payload.
+        snapshot = StoreSnapshot.from_response_data(response_data)
+        unsorted_position = snapshot.unsorted_position()
 
         assert response_status_code == 200
         assert response_ok is True
-        assert len(response_data) == num_total_entries
-        assert len(keys_from_server) == len(set(keys_from_server))
-        assert sorted_keys_from_server == keys_from_server
+        assert len(snapshot) == num_total_entries
+        assert snapshot.duplicate_count == 0
+        assert unsorted_position is None, "Ids out of order at position {}: {}".format(
+            unsorted_position, snapshot.ids[unsorted_position:unsorted_position + 2].tolist())
+
+        # The same checks across page boundaries, with small pages fetched in parallel.
+        pages = QuotePages(setup.session, setup.send_request, page_size=4, concurrency=3)
+        paged_snapshot = StoreSnapshot.from_pairs(pages)
+
+        assert pages.consistent is True
+        assert pages.count == len(paged_snapshot) == num_total_entries
+        assert paged_snapshot.duplicate_count == 0
+        assert paged_snapshot.unsorted_position() is None
+        assert not snapshot.diff(paged_snapshot)
+
+    def test_snapshot_restore(self, setup, seeded_states):
+        """Not required; a restored snapshot undoes later changes, including the next id to be assigned."""
+        seeded_states.restore(15)
+        seeded_snapshot = _get_snapshot_from_server(setup.session, setup.send_request)
+        next_id = _get_key_value_from_response(setup.send_request.post_quote(setup.session, 'Added'), 'data')['id']
+        assert_status(setup.send_request.delete(setup.session, seeded_snapshot.ids[0]), 200)
+
+        seeded_states.restore(15)
+        restored_snapshot = _get_snapshot_from_server(setup.session, setup.send_request)
+        restored_next_id = _get_key_value_from_response(setup.send_request.post_quote(setup.session, 'Added'),
+                                                        'data')['id']
+
+        assert len(seeded_snapshot) == 15
+        assert not seeded_snapshot.diff(restored_snapshot)
+        assert restored_next_id == next_id
+        if seeded_states.supported:
+            assert (15, 0) in seeded_states.snapshot_ids
+
+    def test_get_pages(self, setup):
+        """Not required; GET /quotes with limit/offset and id-range parameters."""
+        post_result = setup.send_request.post_many(setup.session, [f'Page quote {number}' for number in range(7)])
+        assert not post_result.failures, f'Failed POST /quotes requests: {post_result.failures}'
+        all_ids = _get_ids_from_server(setup.session, setup.send_request)
+
+        response = setup.send_request.get_page(setup.session, limit=3, offset=2)
+        page_ids = [elem['id'] for elem in _get_key_value_from_response(response, 'data')]
+        range_response = setup.send_request.get_page(setup.session, min_id=all_ids[4], max_id=all_ids[6])
+        range_ids = [elem['id'] for elem in _get_key_value_from_response(range_response, 'data')]
+        invalid_response = setup.send_request.get_page(setup.session, limit=-1)
+
+        assert _get_status_code(response) == 200
+        assert page_ids == all_ids[2:5]
+        assert _get_key_value_from_response(response, 'total') == len(all_ids)
+        assert range_ids == all_ids[4:7]
+        assert _get_key_value_from_response(range_response, 'total') == 3
+        assert _get_status_code(invalid_response) == 400
+        assert [quote_id for quote_id, _ in QuotePages(setup.session, setup.send_request, page_size=3)] == all_ids
 
     def test_post_requirement1(self, setup):
         """
@@ -329,9 +324,9 @@ class TestCases:
         quote_text = "I have a dream"
 
         # Get the initial id entries from the server
-        initial_ids = _get_ids_from_server(setup.session, setup.send_request)
+        initial_ids = _get_index_from_server(setup.session, setup.send_request)
 
-        response = setup.send_request.post(setup.session, '{"text": "' + quote_text + '"}')
+        response = setup.send_request.post_quote(setup.session, quote_text)
         response_status_code = _get_status_code(response)
         response_ok = _get_key_value_from_response(response, 'ok')
         response_data = _get_key_value_from_response(response, 'data')
@@ -339,7 +334,7 @@ class TestCases:
         response_text = _get_first_value_for_key_from_response_data(response_data, 'text')
 
         # Get the final id entries from the server
-        final_ids = _get_ids_from_server(setup.session, setup.send_request)
+        final_ids = _get_index_from_server(setup.session, setup.send_request)
 
         assert response_status_code == 201
         assert response_ok is True
@@ -413,51 +408,76 @@ class TestCases:
         assert response_status_code == 400
         assert response_ok is False
 
-    def test_post_requirement3(self, setup):
+    def test_post_raw_malformed(self, setup):
+        """
+        Test POST /quotes of a malformed JSON body, sent byte for byte with post_raw.
+        Requirement: Rejects (with HTTP code 400) objects missing the text field.
+        """
+        response = setup.send_request.post_raw(setup.session, b'{"text": }')
+        response_status_code = _get_status_code(response)
+        response_ok = _get_key_value_from_response(response, 'ok')
+
+        assert response.request.body == b'{"text": }'
+        assert response_status_code == 400
+        assert response_ok is False
+
+    def test_post_requirement3(self, setup, quote_data):
         """
         Test POST /quotes of 25 new entries.
         Requirement: Storing at least 20 quotes is supported.
+        Each insert is verified with GET /quotes/<id>; the full GET /quotes list is only reconciled against the
+        locally tracked ids after 1, 2, 4, 8, ... inserts and once at the end. Doubling the interval keeps the
+        quotes returned by all those reads under twice the inserts (plus the initial quotes per read), so the total
+        transfer is linear in the number of inserts.
         """
         num_new_entries = 25
+        next_reconcile = 1
 
         # Get the initial id entries from the server
-        initial_ids = _get_ids_from_server(setup.session, setup.send_request)
+        initial_ids = _get_index_from_server(setup.session, setup.send_request)
         num_initial_ids = len(initial_ids)
-        logger.debug(f'num_initial_ids: {num_initial_ids}')
+        logger.debug('num_initial_ids: %d', num_initial_ids)
+        created_ids = set()
 
         # Loop to create the number of new entries
         for x in range(num_new_entries):
-            logger.debug(f'x: {x}')
-            quote_text = get_sentence(True)
-            post_response = setup.send_request.post(setup.session, '{"text": "' + quote_text + '"}')
+            logger.debug('x: %d', x)
+            quote_text = quote_data.sentence()
+            post_response = setup.send_request.post_quote(setup.session, quote_text)
             assert_status(post_response, 201)
             post_response_status_code = _get_status_code(post_response)
             post_response_ok = _get_key_value_from_response(post_response, 'ok')
             post_response_data = _get_key_value_from_response(post_response, 'data')
             new_id = _get_first_value_for_key_from_response_data(post_response_data, 'id')
-            logger.debug(f'new_id: {new_id}')
+            logger.debug('new_id: %s', new_id)
             response_text = _get_first_value_for_key_from_response_data(post_response_data, 'text')
-            logger.debug(f'response_text: {response_text}')
+            logger.debug('response_text: %s', _Abbreviated(response_text))
 
             try:
-                cur_get_response = setup.send_request.get(setup.session)
-                assert_status(cur_get_response, 200)
-                cur_get_response_data = _get_key_value_from_response(cur_get_response, 'data')
-                cur_ids = _get_all_values_for_key_from_response_data(cur_get_response_data, 'id')
+                cur_get_id_response = setup.send_request.get_id(setup.session, new_id)
+                assert_status(cur_get_id_response, 200)
+                cur_get_id_response_data = _get_key_value_from_response(cur_get_id_response, 'data')
+                cur_get_id_response_text = _get_first_value_for_key_from_response_data(cur_get_id_response_data, 'text')
 
                 assert post_response_status_code == 201
                 assert post_response_ok is True
                 assert response_text == quote_text
                 assert new_id not in initial_ids
-                assert new_id in cur_ids
-            except (AssertionError, TypeError):
+                assert new_id not in created_ids
+                assert cur_get_id_response_text == quote_text
+                created_ids.add(new_id)
+
+                if x + 1 == next_reconcile:
+                    _reconcile_created_ids(setup.session, setup.send_request, initial_ids, created_ids)
+                    next_reconcile *= 2
+            except (AssertionError, TypeError, ResponseError):
                 num_current_entries = num_initial_ids + x
-                logger.error(f'Invalid response from server when number of quotes exceeds {num_current_entries}')
+                logger.error('Invalid response from server when number of quotes exceeds %d', num_current_entries)
 
-        # Get the final id entries from the server
-        final_ids = _get_ids_from_server(setup.session, setup.send_request)
-        num_final_ids = sum(1 for _ in final_ids)
-        logger.debug(f'num_final_ids: {num_final_ids}')
+        # Reconcile the final id entries from the server
+        final_ids = _reconcile_created_ids(setup.session, setup.send_request, initial_ids, created_ids)
+        num_final_ids = len(final_ids)
+        logger.debug('num_final_ids: %d', num_final_ids)
 
         assert num_final_ids == num_initial_ids + num_new_entries
 
@@ -469,10 +489,10 @@ class TestCases:
         quote_text = "a new quote"
 
         # Get the initial id entries from the server
-        initial_ids = _get_ids_from_server(setup.session, setup.send_request)
+        initial_snapshot = _get_snapshot_from_server(setup.session, setup.send_request)
 
         # Add the new quote
-        post_response = setup.send_request.post(setup.session, '{"text": "' + quote_text + '"}')
+        post_response = setup.send_request.post_quote(setup.session, quote_text)
         post_response_status_code = _get_status_code(post_response)
         post_response_ok = _get_key_value_from_response(post_response, 'ok')
         post_response_data = _get_key_value_from_response(post_response, 'data')
@@ -484,11 +504,11 @@ class TestCases:
         get_response_status_code = _get_status_code(get_response)
         get_response_ok = _get_key_value_from_response(get_response, 'ok')
         get_response_data = _get_key_value_from_response(get_response, 'data')
-        found_entry = _get_entry_from_response_data(get_response_data, 'id', new_id)
-        found_entry_text = _get_first_value_for_key_from_response_data(found_entry, 'text')
 
-        # Get the final id entries from the server
-        final_ids = _get_all_values_for_key_from_response_data(get_response_data, 'id')
+        # Compare the final entries from the server with the initial ones
+        final_snapshot = StoreSnapshot.from_response_data(get_response_data, keep_texts=True)
+        found_entry_text = final_snapshot.get_text(new_id)
+        snapshot_diff = initial_snapshot.diff(final_snapshot)
 
         assert post_response_status_code == 201
         assert post_response_ok is True
@@ -496,26 +516,33 @@ class TestCases:
         assert get_response_ok is True
         assert post_response_text == quote_text
         assert found_entry_text == quote_text
-        assert new_id not in initial_ids
-        assert new_id in final_ids
+        assert snapshot_diff.added.tolist() == [new_id]
+        assert len(snapshot_diff.removed) == 0
+        assert len(snapshot_diff.changed) == 0
 
     def test_post_large_quote(self, setup):
         """
         Test POST /quotes of a new entry with a large quote.
         """
         str1 = " "
-        quote_text = str1.join(get_paragraphs(1000, True))
-        logger.debug(f'Size of large quote: {len(quote_text)} characters.')
+        quote_text = str1.join(cached_paragraphs(1000, seed=int(os.environ.get('QUOTES_DATA_SEED', '0'))))
+        logger.debug('Size of large quote: %d characters.', len(quote_text))
 
-        response = setup.send_request.post(setup.session, '{"text": "' + quote_text + '"}')
+        response = setup.send_request.post_quote(setup.session, quote_text)
         response_status_code = _get_status_code(response)
         response_ok = _get_key_value_from_response(response, 'ok')
         response_data = _get_key_value_from_response(response, 'data')
+        response_id = _get_first_value_for_key_from_response_data(response_data, 'id')
         response_text = _get_first_value_for_key_from_response_data(response_data, 'text')
 
+        # Read the stored quote back from a streamed GET /quotes.
+        streamed_text = next((text for quote_id, text in _iter_quotes_from_server(setup.session, setup.send_request)
+                              if quote_id == response_id), None)
+
         assert response_status_code == 201
         assert response_ok is True
         assert response_text == quote_text
+        assert streamed_text == quote_text
 
     def test_get_id_1(self, setup):
         """Test GET /quotes with a valid existing id."""
@@ -549,11 +576,10 @@ class TestCases:
         assert get_all_response_ok is True
 
         # Get the initial id entries from the server
-        initial_ids = _get_all_values_for_key_from_response_data(get_all_response_data, 'id')
+        initial_ids = QuoteIndex(get_all_response_data)
 
         for cur_id in initial_ids:
-            cur_get_all_entry = _get_entry_from_response_data(get_all_response_data, 'id', cur_id)
-            cur_get_all_entry_text = _get_first_value_for_key_from_response_data(cur_get_all_entry, 'text')
+            cur_get_all_entry_text = initial_ids.get_text(cur_id)
 
             # Perform a GET /quotes/<id> for the current id
             cur_get_id_response = setup.send_request.get_id(setup.session, cur_id)
@@ -601,6 +627,9 @@ class TestCases:
         """
         target_id = '3'
 
+        # Get the initial entries from the server
+        initial_snapshot = _get_snapshot_from_server(setup.session, setup.send_request)
+
         # Delete the target_id entry
         first_response = setup.send_request.delete(setup.session, target_id)
         first_response_status_code = _get_status_code(first_response)
@@ -616,12 +645,18 @@ class TestCases:
         third_response_status_code = _get_status_code(third_response)
         third_response_ok = _get_key_value_from_response(third_response, 'ok')
 
+        # Compare the final entries from the server with the initial ones
+        snapshot_diff = initial_snapshot.diff(_get_snapshot_from_server(setup.session, setup.send_request))
+
         assert first_response_status_code == 200
         assert first_response_ok is True
         assert second_response_status_code == 404
         assert second_response_ok is False
         assert third_response_status_code == 404
         assert third_response_ok is False
+        assert snapshot_diff.removed.tolist() == [int(target_id)]
+        assert len(snapshot_diff.added) == 0
+        assert len(snapshot_diff.changed) == 0
 
     def test_delete_requirement2(self, setup):
         """
@@ -631,7 +666,7 @@ class TestCases:
         target_id = '2'
 
         # Get the initial id entries from the server
-        initial_ids = _get_ids_from_server(setup.session, setup.send_request)
+        initial_ids = _get_snapshot_from_server(setup.session, setup.send_request)
         num_initial_ids = len(initial_ids)
 
         # Delete the target_id entry
@@ -641,13 +676,15 @@ class TestCases:
         response_data = _get_key_value_from_response(response, 'data')
 
         # Get the final id entries from the server
-        final_ids = _get_ids_from_server(setup.session, setup.send_request)
+        final_ids = _get_snapshot_from_server(setup.session, setup.send_request)
         num_final_ids = len(final_ids)
+        snapshot_diff = initial_ids.diff(final_ids)
 
         assert response_status_code == 200
         assert response_ok is True
-        assert int(target_id) in initial_ids
-        assert int(target_id) not in final_ids
+        assert snapshot_diff.removed.tolist() == [int(target_id)]
+        assert len(snapshot_diff.added) == 0
+        assert len(snapshot_diff.changed) == 0
         assert num_final_ids == num_initial_ids - 1
         assert response_data is None
 
@@ -701,3 +738,72 @@ class TestCases:
 
         assert response_status_code == 405
         assert response_ok is False
+
+
+if pytest_asyncio is not None:
+    @pytest_asyncio.fixture
+    async def async_setup(quotes_server):
+        """Reset the API and yield an open AsyncSendRequest client"""
+        from pythonapiexample.async_send_request import AsyncSendRequest
+        async with AsyncSendRequest() as client:
+            response = await client.reset()
+            assert _get_status_code(response) == 200
+            assert _get_key_value_from_response(response, 'ok') is True
+            yield client
+
+
+@pytest.mark.skipif(pytest_asyncio is None or importlib.util.find_spec('aiohttp') is None,
+                    reason='The async tests need the \'async\' extra (aiohttp and pytest-asyncio).')
+@pytest.mark.skipif(bool(os.environ.get('QUOTES_REPLAY')),
+                    reason='AsyncSendRequest does not go through the recorded requests.Session.')
+class TestAsyncCases:
+
+    @pytest.mark.asyncio
+    async def test_async_get_id_1(self, async_setup):
+        """Test GET /quotes/<id> with a valid existing id through AsyncSendRequest."""
+        target_id = 1
+        response = await async_setup.get_id(target_id)
+        response_status_code = _get_status_code(response)
+        response_ok = _get_key_value_from_response(response, 'ok')
+        response_data = _get_key_value_from_response(response, 'data')
+        response_text = _get_first_value_for_key_from_response_data(response_data, 'text')
+
+        assert response_status_code == 200
+        assert response_ok is True
+        assert response_text == 'We have nothing to fear but fear itself!'
+
+    @pytest.mark.asyncio
+    async def test_async_custom_method_endpoint(self, async_setup):
+        """AsyncSendRequest.custom_method_endpoint sends the requested HTTP method and rejects unknown ones."""
+        sent_methods = []
+
+        def record_method(passed_timing):
+            sent_methods.append(passed_timing.method)
+
+        SendRequest.hooks.append(record_method)
+        try:
+            for method in ('GET', 'PUT', 'DELETE', 'PATCH'):
+                response = await async_setup.custom_method_endpoint(SendRequest.quotes_endpoint, method)
+                assert response is not None
+            unknown_response = await async_setup.custom_method_endpoint(SendRequest.quotes_endpoint, 'TRACE')
+        finally:
+            SendRequest.hooks.remove(record_method)
+
+        assert sent_methods == ['GET', 'PUT', 'DELETE', 'PATCH']
+        assert unknown_response is None
+
+    @pytest.mark.asyncio
+    async def test_async_post_many(self, async_setup):
+        """Test concurrent POST /quotes through AsyncSendRequest; every new quote appears in GET /quotes."""
+        num_new_entries = 15
+        quote_texts = [f'async quote {x}' for x in range(num_new_entries)]
+
+        post_result = await async_setup.post_many(quote_texts, concurrency=num_new_entries)
+        get_response = await async_setup.get()
+        get_response_data = _get_key_value_from_response(get_response, 'data')
+        quote_index = QuoteIndex(get_response_data)
+
+        assert not post_result.failures
+        assert len(set(post_result.created_ids)) == num_new_entries
+        for new_id, quote_text in zip(post_result.ids, quote_texts):
+            assert quote_index.get_text(new_id) == quote_text
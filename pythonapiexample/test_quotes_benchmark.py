@@ -0,0 +1,84 @@
+import copy
+import json
+
+from pythonapiexample.quotes_benchmark import (SCENARIOS, BenchmarkConfig, QuotesBenchmark, _percentile, _print_report,
+                                               compare_results, main)
+from pythonapiexample.quotes_client import SendRequest
+
+
+class TestPercentile:
+    def test_nearest_rank(self):
+        """The nearest-rank percentile of 1..100 is the value at that rank."""
+        values = list(range(1, 101))
+
+        assert _percentile(values, 50) == 50
+        assert _percentile(values, 95) == 95
+        assert _percentile(values, 99) == 99
+        assert _percentile(values, 100) == 100
+        assert _percentile(values, 7) == 7
+
+    def test_small_and_empty_lists(self):
+        assert _percentile(list(range(1, 11)), 50) == 5
+        assert _percentile(list(range(1, 11)), 95) == 10
+        assert _percentile([3.5], 99) == 3.5
+        assert _percentile([1, 2], 0) == 1
+        assert _percentile([], 50) is None
+
+
+class TestReport:
+    def test_print_report_without_requests(self, capsys):
+        """A scenario that completed no requests prints '-' instead of failing on None."""
+        _print_report({'base_url': 'http://127.0.0.1:1', 'results': {'get_all': {
+            'requests': 0, 'errors': 0, 'duration_s': 0.0, 'requests_per_second': None,
+            'latency_ms': {'mean': None, 'p50': None, 'p95': None, 'p99': None, 'max': None}}}})
+
+        assert capsys.readouterr().out.splitlines()[-1].split() == ['get_all', '-', '-', '-', '-', '0']
+
+
+class TestBenchmark:
+    def test_run_against_local_server(self, local_server):
+        """A small run completes every scenario without errors and reports its latency."""
+        benchmark = QuotesBenchmark(BenchmarkConfig(concurrency=2, store_size=5, payload_size=40,
+                                                    requests_per_scenario=10))
+        try:
+            report = benchmark.run()
+        finally:
+            benchmark.close()
+
+        assert report['base_url'] == local_server.url
+        assert sorted(report['results']) == sorted(SCENARIOS)
+        for result in report['results'].values():
+            assert result['requests'] == 10
+            assert result['errors'] == 0
+            assert result['requests_per_second'] > 0
+            assert 0 < result['latency_ms']['p50'] <= result['latency_ms']['p95'] <= result['latency_ms']['max']
+        assert compare_results(report, report) == []
+
+    def test_compare_results(self):
+        baseline = {'results': {'get_all': {
+            'requests_per_second': 100.0, 'latency_ms': {'p95': 10.0, 'p99': 20.0}}}}
+        current = copy.deepcopy(baseline)
+        current['results']['get_all']['requests_per_second'] = 80.0
+        current['results']['get_all']['latency_ms']['p95'] = 12.0
+        current['results']['post'] = {'requests_per_second': 1.0, 'latency_ms': {'p95': 1.0, 'p99': 1.0}}
+
+        regressions = compare_results(baseline, current)
+
+        assert regressions == ['get_all: throughput dropped from 100.0 to 80.0 req/s',
+                               'get_all: p95 latency rose from 10.00 to 12.00 ms']
+        assert compare_results(baseline, current, threshold=0.25) == []
+
+    def test_main_with_local_server(self, monkeypatch, tmp_path, capsys):
+        """--local benchmarks a server started in the process, whatever --base-url says."""
+        monkeypatch.setattr(SendRequest, 'base_url', SendRequest.base_url)
+        output = tmp_path / 'report.json'
+
+        exit_code = main(['--local', '--base-url', 'http://127.0.0.1:1', '--concurrency', '2', '--store-size', '3',
+                          '--requests', '5', '--scenario', 'get_id', '--output', str(output)])
+
+        report = json.loads(output.read_text(encoding='utf-8'))
+        assert exit_code == 0
+        assert report['base_url'].startswith('http://127.0.0.1:')
+        assert report['base_url'] != 'http://127.0.0.1:1'
+        assert report['results']['get_id']['errors'] == 0
+        assert capsys.readouterr().out.startswith(f"Benchmark against {report['base_url']}")
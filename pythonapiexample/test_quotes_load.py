@@ -0,0 +1,113 @@
+import time
+
+from pythonapiexample.quotes_load import (LoadConfig, LoadGenerator, LoadResult, MultiProcessLoadGenerator,
+                                          _print_report)
+
+
+class TestReport:
+    def test_print_report_without_requests(self, capsys):
+        """An operation or run without completed requests prints '-' instead of failing on None."""
+        result = LoadResult()
+        result.stats_for('get_id')
+
+        _print_report(result.report())
+
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[0] == '0 requests in 0.0s (- req/s)'
+        assert lines[2].split() == ['get_id', '0', '0', '-', '-', '-', '-', '-', '-']
+
+
+class TestLoadGenerator:
+    def test_short_run_has_no_violations(self, local_server):
+        """A short mixed run against the bundled server sends every operation and finds no invariant violations."""
+        generator = LoadGenerator(LoadConfig(duration=0.5, concurrency=2, store_size=20, invariant_interval=0.1,
+                                             seed=1))
+        try:
+            result = generator.run()
+        finally:
+            generator.close()
+
+        assert result.violation_count == 0, result.violations
+        assert result.invariant_checks >= 2
+        assert result.requests > 0
+        assert set(result.operations) <= {'get_id', 'post', 'delete', 'get_all'}
+        for stats in result.operations.values():
+            assert stats.errors == 0
+            assert stats.latency.count == stats.service_time.count
+
+    def test_rate_mode_measures_from_the_intended_start(self, local_server, monkeypatch):
+        """
+        In rate mode a server slower than the arrival rate delays every later request, and that queueing time is
+        counted in the latency, not only in the service time of each request (coordinated omission correction).
+        """
+        generator = LoadGenerator(LoadConfig(mix={'get_id': 1.0}, duration=0.2, rate=50.0, concurrency=1,
+                                             store_size=5, invariant_interval=0, seed=1))
+        send = generator._send
+
+        def slow_send(passed_operation, passed_random, passed_number):
+            time.sleep(0.05)
+            return send(passed_operation, passed_random, passed_number)
+
+        monkeypatch.setattr(generator, '_send', slow_send)
+        try:
+            result = generator.run()
+        finally:
+            generator.close()
+
+        stats = result.operations['get_id']
+        # Every request scheduled in the 0.2 s window is sent, however far behind schedule the worker falls.
+        assert stats.latency.count == stats.service_time.count == 10
+        assert stats.service_time.max < 0.15
+        # The tenth request was due at 0.18 s but could not start before about 0.45 s.
+        assert stats.latency.max > stats.service_time.max + 0.15
+        assert stats.latency.total > stats.service_time.total + 0.5
+        assert result.violation_count == 0, result.violations
+
+
+class TestMultiProcessLoadGenerator:
+    def test_merged_histograms_are_the_sum_of_the_workers(self, local_server):
+        """The merged result adds up the workers' histograms bucket by bucket and finds no violations."""
+        generator = MultiProcessLoadGenerator(LoadConfig(duration=0.5, concurrency=2, store_size=20,
+                                                         invariant_interval=0.1, seed=1), processes=2)
+        try:
+            result = generator.run()
+        finally:
+            generator.close()
+
+        assert result.violation_count == 0, result.violations
+        assert len(generator.worker_results) == 2
+        assert all(worker_result is not None and worker_result.requests > 0
+                   for worker_result in generator.worker_results)
+        assert result.requests == sum(worker_result.requests for worker_result in generator.worker_results)
+        for operation, stats in result.operations.items():
+            worker_stats = [worker_result.operations[operation] for worker_result in generator.worker_results
+                            if operation in worker_result.operations]
+            for name in ('latency', 'service_time'):
+                histogram = getattr(stats, name)
+                assert histogram.counts == [sum(bucket_counts) for bucket_counts
+                                            in zip(*(getattr(each, name).counts for each in worker_stats))]
+                assert histogram.count == sum(getattr(each, name).count for each in worker_stats)
+                assert histogram.max == max(getattr(each, name).max for each in worker_stats)
+
+    def test_worker_that_fails_to_start_is_reported(self, local_server, monkeypatch):
+        """A worker that cannot build its LoadGenerator reports why at once instead of stalling the start."""
+        generator = MultiProcessLoadGenerator(LoadConfig(duration=0.2, concurrency=1, store_size=5,
+                                                         invariant_interval=0), processes=2)
+        worker_config = generator._worker_config
+
+        def broken_worker_config(passed_index):
+            config = worker_config(passed_index)
+            if passed_index == 0:
+                config.as_dict = lambda: {'unknown_setting': True}
+            return config
+
+        monkeypatch.setattr(generator, '_worker_config', broken_worker_config)
+        start = time.perf_counter()
+        try:
+            result = generator.run()
+        finally:
+            generator.close()
+
+        assert time.perf_counter() - start < MultiProcessLoadGenerator.start_timeout / 2
+        assert result.violations[0].startswith('Worker process 0 failed: TypeError:')
+        assert generator.worker_results[0] is None
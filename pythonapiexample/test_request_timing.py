@@ -0,0 +1,86 @@
+import math
+import random
+
+import pytest
+
+from pythonapiexample.quotes_benchmark import _percentile
+from pythonapiexample.request_timing import LatencyHistogram
+
+
+class TestLatencyHistogram:
+    def test_percentile_accuracy(self):
+        """Percentiles stay within the 1/32 relative error of the bucket layout, from microseconds to seconds."""
+        generator = random.Random(1)
+        values = sorted(generator.uniform(1e-6, 10.0) ** 2 / 10.0 for _ in range(10000))
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+
+        for percent in (1, 10, 50, 90, 95, 99, 99.9):
+            expected = values[math.ceil(percent / 100.0 * len(values)) - 1]
+            assert histogram.percentile(percent) == pytest.approx(expected, rel=1 / 32.0, abs=1e-6)
+        assert histogram.percentile(100) == values[-1]
+        assert histogram.min == values[0]
+        assert histogram.count == len(values)
+
+    def test_nearest_rank_matches_the_benchmark(self):
+        """The histogram ranks samples like the benchmark's exact percentile, e.g. p40 of three is the second."""
+        values = [0.001, 0.002, 0.003]
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+
+        for percent in (1, 33, 34, 40, 50, 66, 67, 100):
+            assert histogram.percentile(percent) == pytest.approx(_percentile(values, percent), rel=1 / 32.0)
+        assert histogram.percentile(40) == pytest.approx(0.002, rel=1 / 32.0)
+
+    def test_empty_histogram(self):
+        histogram = LatencyHistogram()
+
+        assert histogram.percentile(50) is None
+        assert histogram.mean is None
+
+    def test_merge_equals_recording_into_one(self):
+        """Merging histograms gives the same buckets and summary as recording every value into one histogram."""
+        generator = random.Random(2)
+        values = [generator.expovariate(20.0) for _ in range(3000)]
+        combined = LatencyHistogram()
+        parts = [LatencyHistogram() for _ in range(3)]
+        for number, value in enumerate(values):
+            combined.record(value)
+            parts[number % 3].record(value)
+
+        merged = LatencyHistogram()
+        for part in parts:
+            assert merged.merge(part) is merged
+
+        assert merged.counts == combined.counts
+        assert merged.count == combined.count
+        assert merged.total == pytest.approx(combined.total)
+        assert (merged.min, merged.max) == (combined.min, combined.max)
+        assert merged.percentile(99) == combined.percentile(99)
+
+    def test_record_corrected(self):
+        """A latency longer than the expected interval back-fills one sample per missed interval."""
+        histogram = LatencyHistogram()
+        histogram.record_corrected(1.0, 0.25)
+
+        assert histogram.count == 4
+        assert histogram.total == pytest.approx(1.0 + 0.75 + 0.5 + 0.25)
+        assert (histogram.min, histogram.max) == (0.25, 1.0)
+
+        for interval in (None, 0, 2.0):
+            histogram = LatencyHistogram()
+            histogram.record_corrected(1.0, interval)
+            assert histogram.count == 1
+
+    def test_dict_round_trip(self):
+        histogram = LatencyHistogram()
+        for value in (0.0005, 0.002, 0.002, 1.5):
+            histogram.record(value)
+
+        restored = LatencyHistogram.from_dict(histogram.to_dict())
+
+        assert restored.counts == histogram.counts
+        assert restored.to_dict() == histogram.to_dict()
+        assert restored.percentile(50) == histogram.percentile(50)
@@ -0,0 +1,107 @@
+import pytest
+
+from pythonapiexample import store_snapshot
+from pythonapiexample.store_snapshot import StoreSnapshot, text_hash
+
+
+@pytest.fixture(params=['numpy', 'fallback'])
+def numpy_mode(request, monkeypatch):
+    """Runs a test once with NumPy, when it is installed, and once with the pure-Python fallbacks"""
+    if request.param == 'numpy':
+        if store_snapshot.numpy is None:
+            pytest.skip('NumPy is not installed')
+    else:
+        monkeypatch.setattr(store_snapshot, 'numpy', None)
+    return request.param
+
+
+def _snapshot(passed_pairs, keep_texts=False):
+    return StoreSnapshot.from_pairs(passed_pairs, keep_texts=keep_texts)
+
+
+class TestStoreSnapshot:
+    def test_sorted_unique_ids(self, numpy_mode):
+        snapshot = _snapshot([(1, 'a'), (2, 'b'), (5, 'c')])
+
+        assert len(snapshot) == 3
+        assert list(snapshot) == [1, 2, 5]
+        assert snapshot.unsorted_position() is None
+        assert snapshot.is_sorted()
+        assert snapshot.duplicate_count == 0
+        assert 5 in snapshot
+        assert 3 not in snapshot
+
+    def test_unsorted_ids_with_duplicates(self, numpy_mode):
+        snapshot = _snapshot([(1, 'a'), (4, 'b'), (2, 'c'), (4, 'd'), (4, 'e'), (7, 'f')])
+
+        assert snapshot.unsorted_position() == 1
+        assert not snapshot.is_sorted()
+        assert snapshot.duplicate_count == 2
+        assert 2 in snapshot
+        assert 3 not in snapshot
+
+    def test_sorted_ids_with_duplicates(self, numpy_mode):
+        snapshot = _snapshot([(1, 'a'), (1, 'b'), (2, 'c'), (3, 'd'), (3, 'e')])
+
+        assert snapshot.is_sorted()
+        assert snapshot.duplicate_count == 2
+
+    def test_texts(self):
+        response_data = [{'id': 1, 'text': 'First'}, {'id': 2, 'text': 'Zweite – ünïcode'}]
+        snapshot = StoreSnapshot.from_response_data(response_data, keep_texts=True)
+
+        assert snapshot.get_text(2) == 'Zweite – ünïcode'
+        assert snapshot.get_text(3) is None
+        assert list(snapshot.hashes) == [text_hash('First'), text_hash('Zweite – ünïcode')]
+        with pytest.raises(ValueError):
+            StoreSnapshot.from_response_data(response_data).get_text(1)
+
+    def test_text_hash_is_stable(self):
+        assert text_hash('A quote') == text_hash('A quote')
+        assert text_hash('A quote') != text_hash('A quote.')
+        assert 0 <= text_hash('A quote') < 2 ** 64
+
+
+class TestSnapshotDiff:
+    def test_identical_snapshots(self, numpy_mode):
+        pairs = [(1, 'a'), (2, 'b'), (3, 'c')]
+
+        snapshot_diff = _snapshot(pairs).diff(_snapshot(pairs))
+
+        assert not snapshot_diff
+        assert (list(snapshot_diff.added), list(snapshot_diff.removed), list(snapshot_diff.changed)) == ([], [], [])
+
+    def test_sorted_snapshots(self, numpy_mode):
+        """Added, removed and changed ids are found by content hash, whatever the rest of the store holds."""
+        before = _snapshot([(1, 'a'), (2, 'b'), (3, 'c'), (5, 'e'), (8, 'h')])
+        after = _snapshot([(2, 'b'), (3, 'C'), (4, 'd'), (5, 'e'), (8, 'H'), (9, 'i')])
+
+        snapshot_diff = before.diff(after)
+
+        assert snapshot_diff
+        assert list(snapshot_diff.added) == [4, 9]
+        assert list(snapshot_diff.removed) == [1]
+        assert list(snapshot_diff.changed) == [3, 8]
+        assert repr(snapshot_diff) == '<SnapshotDiff added=2 removed=1 changed=2>'
+
+        reverse_diff = after.diff(before)
+        assert (list(reverse_diff.added), list(reverse_diff.removed), list(reverse_diff.changed)) == \
+            ([1], [4, 9], [3, 8])
+
+    def test_unsorted_snapshots_with_duplicates(self, numpy_mode):
+        """Each id is reported once, sorted, comparing the text of its first occurrence."""
+        before = _snapshot([(5, 'e'), (1, 'a'), (3, 'c'), (1, 'x'), (7, 'g')])
+        after = _snapshot([(3, 'c'), (9, 'i'), (5, 'E'), (9, 'j'), (1, 'a'), (3, 'z')])
+
+        snapshot_diff = before.diff(after)
+
+        assert list(snapshot_diff.added) == [9]
+        assert list(snapshot_diff.removed) == [7]
+        assert list(snapshot_diff.changed) == [5]
+
+    def test_empty_snapshots(self, numpy_mode):
+        snapshot_diff = _snapshot([]).diff(_snapshot([(2, 'b'), (1, 'a')]))
+
+        assert list(snapshot_diff.added) == [1, 2]
+        assert list(snapshot_diff.removed) == []
+        assert list(_snapshot([(1, 'a')]).diff(_snapshot([])).removed) == [1]
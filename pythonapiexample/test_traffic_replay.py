@@ -0,0 +1,116 @@
+import pytest
+import requests
+
+from pythonapiexample.local_quotes_server import LocalQuotesServer
+from pythonapiexample.quotes_client import SendRequest, _get_key_value_from_response, _iter_quotes_from_server
+from pythonapiexample.traffic_replay import (MAGIC, ReplayAdapter, TrafficRecorder, TrafficReplayer,
+                                             iter_traffic_records)
+
+
+def _send_workload(passed_session):
+    """Sends a fixed sequence of requests and returns their responses"""
+    send_request = SendRequest(use_cache=False)
+    responses = [send_request.reset(passed_session), send_request.get(passed_session),
+                 send_request.post_quote(passed_session, 'A recorded quote')]
+    quote_id = _get_key_value_from_response(responses[-1], 'data')['id']
+    responses.append(send_request.get_id(passed_session, quote_id))
+    responses.append(send_request.delete(passed_session, quote_id))
+    responses.append(send_request.get_id(passed_session, quote_id))
+    return responses
+
+
+@pytest.fixture
+def recording(monkeypatch, tmp_path):
+    """Records _send_workload against a fresh LocalQuotesServer; returns the recording path and the responses"""
+    path = tmp_path / 'quotes.traffic'
+    with LocalQuotesServer() as server:
+        monkeypatch.setattr(SendRequest, 'base_url', server.url)
+        with TrafficRecorder(path) as recorder, requests.Session() as session:
+            monkeypatch.setattr(SendRequest, 'recorder', recorder)
+            responses = _send_workload(session)
+        monkeypatch.setattr(SendRequest, 'recorder', None)
+    return path, responses
+
+
+class TestTrafficReplay:
+    def test_records_read_back_in_order(self, recording):
+        path, responses = recording
+
+        records = list(iter_traffic_records(path))
+
+        assert [(record.method, record.status) for record in records] == \
+            [(response.request.method, response.status_code) for response in responses]
+        assert [record.response_body for record in records] == [response.content for response in responses]
+        assert records[2].request_body == responses[2].request.body
+
+    def test_replay_adapter_serves_the_recording(self, recording):
+        """Replaying the same requests without a server returns the recorded statuses and bodies."""
+        path, responses = recording
+        adapter = ReplayAdapter.from_file(path)
+
+        with requests.Session() as session:
+            session.mount('http://', adapter)
+            replayed = _send_workload(session)
+
+            assert [response.status_code for response in replayed] == [200, 200, 201, 200, 200, 404]
+            assert [(response.status_code, response.content) for response in replayed] == \
+                [(response.status_code, response.content) for response in responses]
+            assert adapter.remaining == 0
+            with pytest.raises(requests.ConnectionError):
+                SendRequest(use_cache=False).get(session)
+
+    def test_replayer_matches_a_fresh_server(self, recording):
+        path, _ = recording
+
+        with LocalQuotesServer() as server:
+            summary = TrafficReplayer(iter_traffic_records(path), server.url, speed=0, concurrency=1).run()
+
+        assert summary['requests'] == 6
+        assert summary['status_mismatches'] == 0, summary['mismatches']
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / 'not.traffic'
+        path.write_bytes(b'{"data": []}')
+
+        with pytest.raises(ValueError):
+            list(iter_traffic_records(path))
+
+        path.write_bytes(MAGIC)
+        assert list(iter_traffic_records(path)) == []
+
+
+class TestStreamedRecording:
+    def test_stream_is_recorded_once_read(self, local_server, monkeypatch, tmp_path):
+        """A streamed body is not read ahead of the caller, and replays like the live stream."""
+        path = tmp_path / 'stream.traffic'
+        send_request = SendRequest(use_cache=False)
+        with TrafficRecorder(path) as recorder, requests.Session() as session:
+            monkeypatch.setattr(SendRequest, 'recorder', recorder)
+            with send_request.get_stream(session) as response:
+                assert recorder.count == 0
+                assert response._content is False
+                chunks = list(response.iter_content(16))
+                assert len(chunks) > 1
+                assert recorder.count == 1
+            live_pairs = list(_iter_quotes_from_server(session, send_request))
+            monkeypatch.setattr(SendRequest, 'recorder', None)
+
+        records = list(iter_traffic_records(path))
+        assert [record.response_body for record in records] == [b''.join(chunks)] * 2
+        with requests.Session() as session:
+            session.mount('http://', ReplayAdapter(records))
+            assert list(_iter_quotes_from_server(session, send_request)) == live_pairs
+
+    def test_closed_stream_is_recorded_in_full(self, local_server, monkeypatch, tmp_path):
+        path = tmp_path / 'stream.traffic'
+        send_request = SendRequest(use_cache=False)
+        with TrafficRecorder(path) as recorder, requests.Session() as session:
+            monkeypatch.setattr(SendRequest, 'recorder', recorder)
+            with send_request.get_stream(session) as response:
+                first_chunk = next(response.iter_content(8))
+            full_body = send_request.get(session).content
+            monkeypatch.setattr(SendRequest, 'recorder', None)
+
+        records = list(iter_traffic_records(path))
+        assert len(first_chunk) == 8
+        assert [record.response_body for record in records] == [full_body, full_body]
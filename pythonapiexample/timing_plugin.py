@@ -0,0 +1,69 @@
+"""
+pytest plugin that times every request sent through SendRequest during a test run. It is enabled by the
+top-level conftest.py, so the pytest-xdist controller loads it too.
+
+At the end of the session a latency summary per method and endpoint, and the tests with the most request time,
+are printed. They are also written as JSON when a file is asked for with --quotes-timing-file=<path> or
+QUOTES_TIMING_FILE=<path>; by default nothing is written. Under pytest-xdist each worker's histograms are merged
+into the controller's.
+"""
+import os
+
+import pytest
+
+from pythonapiexample.quotes_client import SendRequest
+from pythonapiexample.request_timing import TimingRecorder
+
+_WORKER_OUTPUT_KEY = 'quotes_api_timing'
+
+
+def pytest_addoption(parser):
+    parser.addoption('--quotes-timing-file', default=None,
+                     help='Write the quotes API request timing summary as JSON to this file')
+
+
+def pytest_configure(config):
+    recorder = TimingRecorder()
+    config._quotes_timing_recorder = recorder
+    SendRequest.hooks.append(recorder)
+
+
+def pytest_unconfigure(config):
+    recorder = getattr(config, '_quotes_timing_recorder', None)
+    if recorder in SendRequest.hooks:
+        SendRequest.hooks.remove(recorder)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    recorder = item.config._quotes_timing_recorder
+    recorder.label = item.nodeid
+    yield
+    recorder.label = None
+
+
+def pytest_sessionfinish(session, exitstatus):
+    workeroutput = getattr(session.config, 'workeroutput', None)
+    if workeroutput is not None:  # Running as a pytest-xdist worker: hand the histograms to the controller.
+        workeroutput[_WORKER_OUTPUT_KEY] = session.config._quotes_timing_recorder.to_dict()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    worker_timing = getattr(node, 'workeroutput', {}).get(_WORKER_OUTPUT_KEY)
+    if worker_timing is not None:
+        node.config._quotes_timing_recorder.merge(TimingRecorder.from_dict(worker_timing))
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if hasattr(config, 'workeroutput'):
+        return
+    recorder = config._quotes_timing_recorder
+    if not recorder.endpoints:
+        return
+    terminalreporter.write_sep('=', 'quotes API request timing')
+    terminalreporter.write_line(recorder.format_summary())
+    timing_file = config.getoption('--quotes-timing-file') or os.environ.get('QUOTES_TIMING_FILE')
+    if timing_file:
+        recorder.write(timing_file)
+        terminalreporter.write_line(f'Request timing written to {timing_file}')
@@ -0,0 +1,359 @@
+"""
+Record and replay of quotes API traffic.
+
+While SendRequest.recorder is set, every request sent through SendRequest is appended to a recording file together
+with its response and timing; streamed responses are recorded once their body has been read, without buffering it
+ahead of the caller. A recording is a magic header followed by length-prefixed records, so it can be appended to
+by one process and read back through mmap without parsing the whole file:
+
+    record = <metadata length, request body length, response body length> (3 x uint32, little endian)
+             metadata (compact JSON) | request body | response body
+
+ReplayAdapter serves recorded responses to a requests.Session without a server, which re-runs the test suite
+offline (QUOTES_REPLAY=<file>). TrafficReplayer sends the recorded requests to a live server again, at the
+recorded pace or faster.
+
+Example:
+    $ QUOTES_RECORD=quotes.traffic python3 -m pytest pythonapiexample
+    $ QUOTES_REPLAY=quotes.traffic python3 -m pytest pythonapiexample
+    $ python3 -m pythonapiexample.traffic_replay quotes.traffic --base-url http://127.0.0.1:6543 --speed 10
+"""
+import argparse
+import io
+import json
+import logging
+import mmap
+import struct
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers, stream_decode_response_unicode
+
+from pythonapiexample.request_timing import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'QTRAFFIC1\n'
+_RECORD_HEADER = struct.Struct('<III')
+# Request headers that requests sets itself for each connection and must not be replayed verbatim.
+_UNREPLAYED_HEADERS = ('content-length', 'host', 'connection', 'transfer-encoding')
+
+
+def _to_bytes(passed_body):
+    if passed_body is None:
+        return b''
+    return passed_body.encode('utf-8') if isinstance(passed_body, str) else bytes(passed_body)
+
+
+def _path_url(passed_url):
+    """Returns the path and query of a URL, which identifies a request independently of the server address"""
+    parts = urlsplit(passed_url)
+    return (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+
+
+class TrafficRecord:
+    """One recorded request and its response."""
+
+    def __init__(self, method, url, request_headers, request_body, status, reason, response_headers, response_body,
+                 started_at, total, elapsed):
+        self.method = method
+        self.url = url
+        self.request_headers = request_headers
+        self.request_body = request_body
+        self.status = status
+        self.reason = reason
+        self.response_headers = response_headers
+        self.response_body = response_body
+        self.started_at = started_at
+        self.total = total
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return f'<TrafficRecord {self.method} {self.url} [{self.status}]>'
+
+    @property
+    def path_url(self):
+        return _path_url(self.url)
+
+    @property
+    def key(self):
+        return self.method, self.path_url, self.request_body
+
+    def to_bytes(self):
+        metadata = json.dumps({
+            'method': self.method,
+            'url': self.url,
+            'request_headers': self.request_headers,
+            'status': self.status,
+            'reason': self.reason,
+            'response_headers': self.response_headers,
+            'started_at': self.started_at,
+            'total': self.total,
+            'elapsed': self.elapsed,
+        }, separators=(',', ':')).encode('utf-8')
+        return b''.join((_RECORD_HEADER.pack(len(metadata), len(self.request_body), len(self.response_body)),
+                         metadata, self.request_body, self.response_body))
+
+    @classmethod
+    def from_response(cls, passed_response, passed_started_at, passed_total):
+        request = passed_response.request
+        return cls(request.method, request.url, dict(request.headers), _to_bytes(request.body),
+                   passed_response.status_code, passed_response.reason, dict(passed_response.headers),
+                   passed_response.content, passed_started_at, passed_total,
+                   passed_response.elapsed.total_seconds())
+
+
+class TrafficRecorder:
+    """Appends TrafficRecords to a recording file; safe to share between threads."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        self.count = 0
+
+    def record(self, passed_response, passed_started_at, passed_total):
+        """Records a response with its request; reads the whole body of a streamed response"""
+        data = TrafficRecord.from_response(passed_response, passed_started_at, passed_total).to_bytes()
+        with self._lock:
+            self._file.write(data)
+            self.count += 1
+
+    def record_stream(self, passed_response, passed_started_at, passed_total):
+        """
+        Records a streamed response without reading its body first: the chunks pass through iter_content as the
+        caller reads them, and the record is written once the body is read or the response is closed
+        """
+        _StreamTee(self, passed_response, passed_started_at, passed_total)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class _StreamTee:
+    """Copies the body of a streamed response as it is read and records the response at its end."""
+
+    # Chunk size used to read the rest of a body the caller closed before reading it all.
+    drain_chunk_size = 64 * 1024
+
+    def __init__(self, passed_recorder, passed_response, passed_started_at, passed_total):
+        self.recorder = passed_recorder
+        self.response = passed_response
+        self.started_at = passed_started_at
+        self.total = passed_total
+        self.chunks = []
+        self.recorded = False
+        self._iter_content = passed_response.iter_content
+        self._close = passed_response.close
+        passed_response.iter_content = self.iter_content
+        passed_response.close = self.close
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        chunks = self._tee(chunk_size)
+        return stream_decode_response_unicode(chunks, self.response) if decode_unicode else chunks
+
+    def _tee(self, passed_chunk_size):
+        for chunk in self._iter_content(passed_chunk_size):
+            self.chunks.append(chunk)
+            yield chunk
+        self._record()
+
+    def _record(self):
+        if self.recorded:
+            return
+        self.recorded = True
+        self.response._content = b''.join(self.chunks)
+        self.recorder.record(self.response, self.started_at, self.total)
+
+    def close(self):
+        try:
+            if not self.recorded:
+                # The recording needs the whole body, so read whatever the caller left unread.
+                if not self.response._content_consumed:
+                    self.chunks.extend(self._iter_content(_StreamTee.drain_chunk_size))
+                self._record()
+        finally:
+            self._close()
+
+
+def iter_traffic_records(passed_path):
+    """Yields the TrafficRecords of a recording file in order, reading it through mmap"""
+    with open(passed_path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{passed_path} is not a quotes API traffic recording.')
+        f.seek(0, 2)
+        if f.tell() == len(MAGIC):
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            offset = len(MAGIC)
+            size = len(mapped)
+            while offset + _RECORD_HEADER.size <= size:
+                metadata_length, request_length, response_length = _RECORD_HEADER.unpack_from(mapped, offset)
+                offset += _RECORD_HEADER.size
+                end = offset + metadata_length + request_length + response_length
+                if end > size:
+                    logger.error('Ignoring a truncated record at the end of %s', passed_path)
+                    return
+                metadata = json.loads(mapped[offset:offset + metadata_length])
+                offset += metadata_length
+                request_body = mapped[offset:offset + request_length]
+                offset += request_length
+                response_body = mapped[offset:end]
+                offset = end
+                yield TrafficRecord(metadata['method'], metadata['url'], metadata['request_headers'], request_body,
+                                    metadata['status'], metadata['reason'], metadata['response_headers'],
+                                    response_body, metadata['started_at'], metadata['total'], metadata['elapsed'])
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    A requests transport adapter that answers from a recording instead of the network.
+    Requests are matched on method, path and body, whatever the server address; repeated identical requests get
+    their recorded responses in recorded order. A request with no recorded response left raises ConnectionError.
+    """
+
+    def __init__(self, passed_records):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._responses = defaultdict(deque)
+        for record in passed_records:
+            self._responses[record.key].append(record)
+
+    @classmethod
+    def from_file(cls, passed_path):
+        return cls(iter_traffic_records(passed_path))
+
+    @property
+    def remaining(self):
+        """The number of recorded responses not served yet"""
+        with self._lock:
+            return sum(len(responses) for responses in self._responses.values())
+
+    def send(self, request, **kwargs):
+        key = request.method, _path_url(request.url), _to_bytes(request.body)
+        with self._lock:
+            responses = self._responses.get(key)
+            record = responses.popleft() if responses else None
+        if record is None:
+            raise requests.ConnectionError(f'No recorded response for {request.method} {request.url}',
+                                           request=request)
+        response = requests.Response()
+        response.status_code = record.status
+        response.reason = record.reason
+        response.headers = CaseInsensitiveDict(record.response_headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = record.response_body
+        response._content_consumed = True
+        response.raw = io.BytesIO(record.response_body)
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=record.elapsed)
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+class TrafficReplayer:
+    """Sends recorded requests to a live server, keeping their recorded spacing divided by 'speed'."""
+
+    def __init__(self, passed_records, base_url, speed=1.0, concurrency=16):
+        self.records = list(passed_records)
+        self.base_url = base_url.rstrip('/')
+        self.speed = speed
+        self.concurrency = concurrency
+
+    def _send(self, passed_session, passed_record, passed_intended):
+        headers = {name: value for name, value in passed_record.request_headers.items()
+                   if name.lower() not in _UNREPLAYED_HEADERS}
+        try:
+            response = passed_session.request(passed_record.method, self.base_url + passed_record.path_url,
+                                              headers=headers, data=passed_record.request_body or None)
+            status = response.status_code
+        except requests.RequestException as ex:
+            logger.error('%s %s failed: %s', passed_record.method, passed_record.path_url, ex)
+            status = None
+        return status, time.perf_counter() - passed_intended
+
+    def run(self):
+        """Replays every record and returns a JSON serializable summary"""
+        latency = LatencyHistogram()
+        mismatches = []
+        if not self.records:
+            return {'requests': 0, 'duration_s': 0.0, 'status_mismatches': 0, 'mismatches': [], 'latency_ms': {}}
+        first_started_at = self.records[0].started_at
+        session = requests.Session()
+        session.mount(self.base_url, requests.adapters.HTTPAdapter(pool_maxsize=self.concurrency))
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = []
+            for record in self.records:
+                if self.speed:
+                    # Latency is measured from the intended send time, so a slow server cannot hide queueing.
+                    intended = start + (record.started_at - first_started_at) / self.speed
+                    delay = intended - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                else:
+                    intended = time.perf_counter()
+                futures.append((record, executor.submit(self._send, session, record, intended)))
+            for record, future in futures:
+                status, elapsed = future.result()
+                latency.record(elapsed)
+                if status != record.status:
+                    mismatches.append(f'{record.method} {record.path_url}: recorded {record.status}, got {status}')
+        duration = time.perf_counter() - start
+        session.close()
+        return {
+            'requests': len(self.records),
+            'duration_s': duration,
+            'status_mismatches': len(mismatches),
+            'mismatches': mismatches[:20],
+            'latency_ms': {name: latency.percentile(percent) * 1000.0
+                           for name, percent in (('p50', 50), ('p95', 95), ('p99', 99))},
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replay recorded quotes API traffic against a server.')
+    parser.add_argument('recording', help='Recording file written with QUOTES_RECORD or SendRequest.recorder')
+    parser.add_argument('--base-url', default='http://127.0.0.1:6543', help='Server to replay against')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='Replay speed relative to the recording; 0 sends as fast as possible')
+    parser.add_argument('--concurrency', type=int, default=16, help='Requests in flight at once')
+    parser.add_argument('--output', help='Write the JSON summary to this file')
+    args = parser.parse_args(argv)
+
+    replayer = TrafficReplayer(iter_traffic_records(args.recording), args.base_url, speed=args.speed,
+                               concurrency=args.concurrency)
+    report = replayer.run()
+    print(f"Replayed {report['requests']} requests in {report['duration_s']:.2f}s, "
+          f"{report['status_mismatches']} status mismatches")
+    for mismatch in report['mismatches']:
+        print(f'  {mismatch}')
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4, sort_keys=True)
+    return 1 if report['status_mismatches'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
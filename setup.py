@@ -18,9 +18,14 @@ setup(
     install_requires=[
         'pytest',
         'requests',
-        'loremipsum',
         'jsonpath'
     ],
+    extras_require={
+        'parallel': ['pytest-xdist'],
+        'async': ['aiohttp', 'pytest-asyncio'],
+        'snapshot': ['numpy'],
+        'fastjson': ['orjson']
+    },
     url='https://github.com/CraigSample/python_api_example',
     license='',
     author='Craig D\'Orsay',